@@ -7,9 +7,11 @@ from pathlib import Path
 from datetime import datetime
 
 # Use relative imports
-from utils import info, error, warning, get_accounts_file_path, get_app_data_dir
+from utils import get_logger, get_accounts_file_path, get_app_data_dir, traced
 from db_manager import backup_account, restore_account, get_current_account_info
-from process_manager import close_antigravity, start_antigravity
+from process_manager import close_antigravity, is_process_running, start_antigravity, wait_ready
+
+log = get_logger("antigravity")
 
 def load_accounts():
     """Load account list"""
@@ -21,7 +23,7 @@ def load_accounts():
         with open(file_path, 'r', encoding='utf-8') as f:
             return json.load(f)
     except Exception as e:
-        error(f"Failed to load account list: {e}")
+        log.error(f"Failed to load account list: {e}")
         return {}
 
 def save_accounts(accounts):
@@ -32,20 +34,20 @@ def save_accounts(accounts):
             json.dump(accounts, f, ensure_ascii=False, indent=2)
         return True
     except Exception as e:
-        error(f"Failed to save account list: {e}")
+        log.error(f"Failed to save account list: {e}")
         return False
 
 def add_account_snapshot(name=None, email=None):
     """Add current state as new account, overwrite if email exists"""
     # 0. Auto-get info
     if not email:
-        info("Attempting to read account info from database...")
+        log.info("Attempting to read account info from database...")
         account_info = get_current_account_info()
         if account_info and "email" in account_info:
             email = account_info["email"]
-            info(f"Automatically obtained email: {email}")
+            log.info(f"Automatically obtained email: {email}")
         else:
-            warning("Cannot auto-get email from DB, using 'Unknown'")
+            log.warning("Cannot auto-get email from DB, using 'Unknown'")
             email = "Unknown"
             
     if not name:
@@ -54,7 +56,7 @@ def add_account_snapshot(name=None, email=None):
             name = email.split("@")[0]
         else:
             name = f"Account_{int(time.time())}"
-        info(f"Using auto-generated name: {name}")
+        log.info(f"Using auto-generated name: {name}")
 
     # 1. Check if account with same email exists
     accounts = load_accounts()
@@ -68,7 +70,7 @@ def add_account_snapshot(name=None, email=None):
             break
     
     if existing_account:
-        info(f"Detected existing backup for email {email}, overwriting old backup")
+        log.info(f"Detected existing backup for email {email}, overwriting old backup")
         # Using existing ID and backup path
         account_id = existing_id
         backup_path = Path(existing_account["backup_file"])
@@ -78,7 +80,7 @@ def add_account_snapshot(name=None, email=None):
         if not name or name == email.split("@")[0]:
             name = existing_account.get("name", name)
     else:
-        info(f"Creating new account backup: {email}")
+        log.info(f"Creating new account backup: {email}")
         # Generating new ID and backup path
         account_id = str(uuid.uuid4())
         backup_filename = f"{account_id}.json"
@@ -88,9 +90,9 @@ def add_account_snapshot(name=None, email=None):
         created_at = datetime.now().isoformat()
     
     # 2. Execute backup
-    info(f"Backing up current state for account: {name}")
+    log.info(f"Backing up current state for account: {name}")
     if not backup_account(email, str(backup_path)):
-        error("Backup failed, cancelling account addition")
+        log.error("Backup failed, cancelling account addition")
         return False
     
     # 3. Update account list
@@ -105,9 +107,9 @@ def add_account_snapshot(name=None, email=None):
     
     if save_accounts(accounts):
         if existing_account:
-            info(f"Account {name} ({email}) backup updated")
+            log.info(f"Account {name} ({email}) backup updated")
         else:
-            info(f"Account {name} ({email}) added successfully")
+            log.info(f"Account {name} ({email}) added successfully")
         return True
     return False
 
@@ -115,7 +117,7 @@ def delete_account(account_id):
     """Delete account"""
     accounts = load_accounts()
     if account_id not in accounts:
-        error("Account not found")
+        log.error("Account not found")
         return False
     
     account = accounts[account_id]
@@ -126,22 +128,31 @@ def delete_account(account_id):
     if backup_file and os.path.exists(backup_file):
         try:
             os.remove(backup_file)
-            info(f"Backup file deleted: {backup_file}")
+            log.info(f"Backup file deleted: {backup_file}")
         except Exception as e:
-            warning(f"Failed to delete backup file: {e}")
+            log.warning(f"Failed to delete backup file: {e}")
     
     # Remove from list
     del accounts[account_id]
     if save_accounts(accounts):
-        info(f"Account {name} deleted")
+        log.info(f"Account {name} deleted")
         return True
     return False
 
-def switch_account(account_id):
-    """Switch to specified account"""
+@traced("switch", source="antigravity")
+def switch_account(account_id, wait=False, ready_timeout=30, restart=True):
+    """Switch to specified account
+
+    Args:
+        wait: Block until the restarted app is ready and report end-to-end latency
+        ready_timeout: Max seconds to wait for readiness
+        restart: Start Antigravity after restoring; False only restores the data
+                 (e.g. batch restores while the app stays closed)
+    """
+    switch_start = time.monotonic()
     accounts = load_accounts()
     if account_id not in accounts:
-        error("Account not found")
+        log.error("Account not found")
         return False
     
     account = accounts[account_id]
@@ -149,15 +160,17 @@ def switch_account(account_id):
     backup_file = account.get("backup_file")
     
     if not backup_file or not os.path.exists(backup_file):
-        error(f"Backup file missing: {backup_file}")
+        log.error(f"Backup file missing: {backup_file}")
         return False
     
-    info(f"Preparing to switch to account: {name}")
+    log.info(f"Preparing to switch to account: {name}")
     
-    # 1. Close process
-    if not close_antigravity():
+    # 1. Close process (skipped entirely, quit request and waits included, when it isn't running)
+    if not is_process_running(fresh=True):
+        log.info("Antigravity is not running, skipping close")
+    elif not close_antigravity():
         # Try to continue, but warn
-        warning("Cannot close Antigravity, attempting forced restore...")
+        log.warning("Cannot close Antigravity, attempting forced restore...")
     
     # 2. Restore data
     if restore_account(backup_file):
@@ -166,11 +179,19 @@ def switch_account(account_id):
         save_accounts(accounts)
         
         # 3. Start process
+        if not restart:
+            log.info(f"Restored account {name} in {time.monotonic() - switch_start:.1f}s (not restarting Antigravity)")
+            return True
         start_antigravity()
-        info(f"Switched to account {name} successfully")
+        if wait:
+            if wait_ready(ready_timeout) is None:
+                log.warning("Antigravity did not become ready in time")
+            else:
+                log.info(f"Switch completed in {time.monotonic() - switch_start:.1f}s")
+        log.info(f"Switched to account {name} successfully")
         return True
     else:
-        error("Restore data failed")
+        log.error("Restore data failed")
         return False
 
 def list_accounts_data():
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+Follow the managed apps' own log files.
+
+- Antigravity: the Electron/VS Code style logs/<session>/ tree next to the
+  user data dir (main.log, window renderer logs, extension host, ...); only
+  the newest session is followed
+- Claude Code: ~/.claude/debug (written when running with --debug)
+
+New bytes are read incrementally from the last position, driven by
+fs_watch (inotify on Linux, polling elsewhere). Positions are checkpointed
+in the app data dir, so reopening the manager continues where it left off
+instead of re-reading the files. A file seen for the first time starts near
+its end.
+"""
+import json
+import os
+import threading
+from pathlib import Path
+
+from fs_watch import FileWatcher
+from utils import debug, get_antigravity_db_paths, get_app_data_dir, warning
+
+# Bytes shown from the end of a file without a checkpoint
+INITIAL_TAIL_BYTES = 16 * 1024
+# Unread backlog above which a file skips ahead to its last INITIAL_TAIL_BYTES
+MAX_BACKLOG_BYTES = 1024 * 1024
+# Claude debug files followed (newest first)
+MAX_CLAUDE_FILES = 5
+LOG_SUFFIXES = (".log", ".txt")
+
+
+def get_checkpoint_path():
+    return get_app_data_dir() / "log_checkpoints.json"
+
+
+def get_antigravity_log_root():
+    """Antigravity's logs dir (sibling of User/), None if not found"""
+    for db_path in get_antigravity_db_paths():
+        for parent in db_path.parents:
+            if parent.name == "Antigravity":
+                logs = parent / "logs"
+                if logs.is_dir():
+                    return logs
+                break
+    return None
+
+
+def _antigravity_files():
+    root = get_antigravity_log_root()
+    if not root:
+        return [], []
+    sessions = sorted((p for p in root.iterdir() if p.is_dir()), key=lambda p: p.name)
+    if not sessions:
+        return [], [root]
+    session = sessions[-1]
+    files = []
+    dirs = {root, session}
+    for p in session.rglob("*"):
+        if p.is_dir():
+            # Watched even while empty, log files show up there later
+            dirs.add(p)
+        elif p.suffix in LOG_SUFFIXES:
+            files.append(p)
+    return files, sorted(dirs)
+
+
+def _claude_files():
+    debug_dir = Path.home() / ".claude" / "debug"
+    if not debug_dir.is_dir():
+        return [], []
+    files = []
+    for p in debug_dir.iterdir():
+        try:
+            if p.is_file() and p.suffix in LOG_SUFFIXES:
+                files.append((p.stat().st_mtime, p))
+        except OSError:
+            continue
+    files.sort(reverse=True)
+    return [p for _, p in files[:MAX_CLAUDE_FILES]], [debug_dir]
+
+
+DISCOVERY = {
+    "antigravity": _antigravity_files,
+    "claude": _claude_files,
+}
+
+
+class AppLogTailer:
+    """Stream new lines of the apps' log files to on_lines(source, path, lines)"""
+
+    def __init__(self, on_lines, sources=None, checkpoint_path=None):
+        self.on_lines = on_lines
+        self.sources = list(sources or DISCOVERY)
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else get_checkpoint_path()
+        self._positions = self._load_checkpoints()
+        self._files = {}
+        self._dirs = []
+        self._watcher = None
+        self._lock = threading.Lock()
+
+    # ---------------------------------------------------------------------
+    # Checkpoints
+    # ---------------------------------------------------------------------
+
+    def _load_checkpoints(self):
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_checkpoints(self):
+        # Only keep files that still exist so the file doesn't grow forever
+        positions = {path: pos for path, pos in self._positions.items() if os.path.exists(path)}
+        tmp = self.checkpoint_path.with_suffix(".tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(positions, f)
+            os.replace(tmp, self.checkpoint_path)
+        except OSError as e:
+            warning(f"Failed to save log checkpoints: {e}")
+
+    # ---------------------------------------------------------------------
+    # Watching
+    # ---------------------------------------------------------------------
+
+    def start(self):
+        with self._lock:
+            self._discover()
+            self._read_all()
+        self._restart_watcher()
+
+    def stop(self):
+        if self._watcher:
+            self._watcher.stop()
+            self._watcher = None
+        with self._lock:
+            self._save_checkpoints()
+
+    def _discover(self):
+        """Refresh the followed files, returns True if the watched dirs changed"""
+        files = {}
+        dirs = set()
+        for source in self.sources:
+            found, found_dirs = DISCOVERY[source]()
+            for path in found:
+                files[str(path)] = source
+            dirs.update(found_dirs)
+        self._files = files
+        dirs = sorted(dirs)
+        changed = dirs != self._dirs
+        self._dirs = dirs
+        return changed
+
+    def _restart_watcher(self):
+        if self._watcher:
+            self._watcher.stop()
+            self._watcher = None
+        if self._dirs:
+            self._watcher = FileWatcher(self._dirs, self._on_change, debounce=0.3)
+            self._watcher.start()
+            debug(f"Following {len(self._files)} app log files")
+
+    def _on_change(self, paths):
+        with self._lock:
+            dirs_changed = self._discover()
+            changed = {str(p) for p in paths}
+            for path, source in list(self._files.items()):
+                if path in changed or path not in self._positions:
+                    self._read(path, source)
+            self._save_checkpoints()
+        if dirs_changed:
+            # A new session dir or log subdir appeared (e.g. Antigravity restarted)
+            self._restart_watcher()
+
+    def _read_all(self):
+        for path, source in self._files.items():
+            self._read(path, source)
+        self._save_checkpoints()
+
+    def _read(self, path, source):
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        pos = self._positions.get(path)
+        if pos is not None and pos > size:
+            # Truncated or replaced, start over
+            pos = 0
+        mid_line = False
+        if pos is None or size - pos > MAX_BACKLOG_BYTES:
+            pos = max(0, size - INITIAL_TAIL_BYTES)
+            mid_line = pos > 0
+        if pos == size:
+            self._positions[path] = pos
+            return
+
+        try:
+            with open(path, "rb") as f:
+                f.seek(pos)
+                data = f.read(size - pos)
+        except OSError:
+            return
+
+        # Only consume complete lines; a partial last line is read again next time
+        end = data.rfind(b"\n")
+        if end < 0:
+            return
+        chunk = data[:end + 1]
+        if mid_line:
+            # Started inside a line: drop the cut part
+            chunk = chunk[chunk.find(b"\n") + 1:]
+        self._positions[path] = pos + end + 1
+
+        lines = [line for line in chunk.decode("utf-8", "replace").splitlines() if line.strip()]
+        if lines:
+            try:
+                self.on_lines(source, Path(path), lines)
+            except Exception as e:
+                warning(f"App log callback failed: {e}")
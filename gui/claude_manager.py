@@ -1,19 +1,35 @@
 # -*- coding: utf-8 -*-
 import os
 import json
+import hashlib
 import platform
+import re
+import shutil
 import subprocess
+import time
 import uuid
 from pathlib import Path
 from datetime import datetime
 
 # Use relative imports
-from utils import info, error, warning, debug
+from utils import get_logger, load_settings, save_settings, traced
+from credential_backend import LIVE_KEY, account_key, create_default_backend
+
+log = get_logger("claude")
 
 # Configuration
 BACKUP_DIR = Path.home() / ".claude-switch-backup"
 SEQUENCE_FILE = BACKUP_DIR / "sequence.json"
 
+# Isolated mode: one CLAUDE_CONFIG_DIR per account, switching only repoints the env profile
+PROFILES_DIR = BACKUP_DIR / "profiles"
+ACTIVE_PROFILE_FILE = BACKUP_DIR / "active-profile.sh"
+LAUNCHER_FILE = BACKUP_DIR / "bin" / "claude-active"
+SWITCH_MODE_SHARED = "shared"
+SWITCH_MODE_ISOLATED = "isolated"
+
+_credential_backend = None
+
 def get_claude_config_path():
     """Get Claude configuration file path with fallback"""
     primary_config = Path.home() / ".claude" / ".claude.json"
@@ -32,6 +48,9 @@ def get_claude_config_path():
 
 def get_current_account_email():
     """Get current account email from config"""
+    if get_switch_mode() == SWITCH_MODE_ISOLATED:
+        return _get_active_isolated_email()
+
     config_path = get_claude_config_path()
     if not config_path.exists():
         return None
@@ -43,57 +62,33 @@ def get_current_account_email():
     except:
         return None
 
+def get_credential_backend():
+    """Get the credential backend for this platform (created on first use)"""
+    global _credential_backend
+    if _credential_backend is None:
+        _credential_backend = create_default_backend(platform.system(), BACKUP_DIR / "credentials")
+    return _credential_backend
+
+def set_credential_backend(backend):
+    """Override the credential backend (e.g. MemoryBackend in tests)"""
+    global _credential_backend
+    _credential_backend = backend
+
 def read_credentials():
-    """Read credentials based on platform"""
-    system = platform.system()
-    if system == "Darwin":
-        try:
-            result = subprocess.run(
-                ["security", "find-generic-password", "-s", "Claude Code-credentials", "-w"],
-                capture_output=True, text=True
-            )
-            if result.returncode == 0:
-                return result.stdout.strip()
-        except Exception as e:
-            error(f"Error reading credentials: {e}")
-    elif system == "Linux":
-        cred_path = Path.home() / ".claude" / ".credentials.json"
-        if cred_path.exists():
-            try:
-                with open(cred_path, 'r', encoding='utf-8') as f:
-                    return f.read()
-            except:
-                pass
-    return None
+    """Read live credentials from the platform backend"""
+    backend = get_credential_backend()
+    if not backend:
+        return None
+    return backend.read(LIVE_KEY)
 
 def write_credentials(credentials):
-    """Write credentials based on platform"""
+    """Write live credentials to the platform backend"""
     if not credentials:
         return False
-        
-    system = platform.system()
-    if system == "Darwin":
-        try:
-            user = os.environ.get("USER", "unknown")
-            subprocess.run(
-                ["security", "add-generic-password", "-U", "-s", "Claude Code-credentials", "-a", user, "-w", credentials],
-                check=True
-            )
-            return True
-        except Exception as e:
-            error(f"Error writing credentials: {e}")
-            return False
-    elif system == "Linux":
-        cred_path = Path.home() / ".claude" / ".credentials.json"
-        cred_path.parent.mkdir(parents=True, exist_ok=True)
-        try:
-            with open(cred_path, 'w', encoding='utf-8') as f:
-                f.write(credentials)
-            os.chmod(cred_path, 0o600)
-            return True
-        except:
-            return False
-    return False
+    backend = get_credential_backend()
+    if not backend:
+        return False
+    return backend.write(LIVE_KEY, credentials)
 
 def setup_directories():
     """Setup backup directories"""
@@ -131,55 +126,70 @@ def get_next_account_number():
     except:
         return 1
 
-def add_account_snapshot():
-    """Add current account snapshot"""
-    setup_directories()
-    init_sequence_file()
-    
-    current_email = get_current_account_email()
+def compute_fingerprint(credentials, oauth_account):
+    """Hash of credentials + oauthAccount, used to detect unchanged snapshots"""
+    digest = hashlib.sha256()
+    digest.update((credentials or "").encode('utf-8'))
+    digest.update(b"\0")
+    digest.update(json.dumps(oauth_account or {}, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+def add_account_snapshot(only_if_changed=False):
+    """Add current account snapshot
+
+    Args:
+        only_if_changed: Skip all writes when the stored fingerprint of the
+                         managed account matches the live state (used before switching)
+    """
+    config_path = get_claude_config_path()
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            current_config = f.read()
+        config_json = json.loads(current_config)
+    except Exception:
+        log.error("No active Claude account found config file.")
+        return False
+
+    oauth_account = config_json.get('oauthAccount', {})
+    current_email = oauth_account.get('emailAddress')
     if not current_email:
-        error("No active Claude account found config file.")
+        log.error("No active Claude account found config file.")
         return False
-        
-    # Check if account exists
+    account_uuid = oauth_account.get('accountUuid')
+
+    init_sequence_file()
     with open(SEQUENCE_FILE, 'r', encoding='utf-8') as f:
-        seq_data = json.load(f)
-        for acc_num, acc_data in seq_data.get("accounts", {}).items():
-            if acc_data.get("email") == current_email:
-                info(f"Account {current_email} is already managed (Account-{acc_num}). Updating...")
-                account_num = acc_num
-                break
-        else:
-            account_num = str(get_next_account_number())
-            
+        data = json.load(f)
+
+    # Check if account exists
+    account_num = None
+    for acc_num, acc_data in data.get("accounts", {}).items():
+        if acc_data.get("email") == current_email:
+            account_num = acc_num
+            break
+
     current_creds = read_credentials()
     if not current_creds:
-        error("No credentials found for current account")
-        return False
-        
-    config_path = get_claude_config_path()
-    try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            current_config = f.read()
-            config_json = json.loads(current_config)
-            account_uuid = config_json.get('oauthAccount', {}).get('accountUuid')
-    except Exception as e:
-        error(f"Error reading config: {e}")
+        log.error("No credentials found for current account")
         return False
 
+    fingerprint = compute_fingerprint(current_creds, oauth_account)
+    if account_num is not None:
+        if only_if_changed and data["accounts"][account_num].get("fingerprint") == fingerprint:
+            log.debug(f"Account {current_email} (Account-{account_num}) unchanged since last snapshot, skipping backup")
+            return True
+        log.info(f"Account {current_email} is already managed (Account-{account_num}). Updating...")
+    else:
+        keys = [int(k) for k in data.get("accounts", {}).keys()]
+        account_num = str(max(keys) + 1 if keys else 1)
+
+    setup_directories()
+
     # Write backups
-    system = platform.system()
-    if system == "Darwin":
-        user = os.environ.get("USER", "unknown")
-        subprocess.run(
-            ["security", "add-generic-password", "-U", "-s", f"Claude Code-Account-{account_num}-{current_email}", "-a", user, "-w", current_creds],
-            check=True
-        )
-    elif system == "Linux":
-        cred_file = BACKUP_DIR / "credentials" / f".claude-credentials-{account_num}-{current_email}.json"
-        with open(cred_file, 'w', encoding='utf-8') as f:
-            f.write(current_creds)
-        os.chmod(cred_file, 0o600)
+    backend = get_credential_backend()
+    if not backend.write(account_key(account_num, current_email), current_creds):
+        log.error("Failed to back up credentials")
+        return False
         
     config_file = BACKUP_DIR / "configs" / f".claude-config-{account_num}-{current_email}.json"
     with open(config_file, 'w', encoding='utf-8') as f:
@@ -188,9 +198,6 @@ def add_account_snapshot():
     
     # Update sequence
     now = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-    
-    with open(SEQUENCE_FILE, 'r', encoding='utf-8') as f:
-        data = json.load(f)
         
     if str(account_num) not in data.get("accounts", {}):
         data.setdefault("accounts", {})[str(account_num)] = {
@@ -200,14 +207,17 @@ def add_account_snapshot():
         }
         if int(account_num) not in data.get("sequence", []):
             data.setdefault("sequence", []).append(int(account_num))
-            
-    data["activeAccountNumber"] = int(account_num)
+
+    data["accounts"][str(account_num)]["fingerprint"] = fingerprint
+    # In isolated mode the active account is the active profile, not the shared login
+    if get_switch_mode() != SWITCH_MODE_ISOLATED:
+        data["activeAccountNumber"] = int(account_num)
     data["lastUpdated"] = now
     
     with open(SEQUENCE_FILE, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=2)
         
-    info(f"Added/Updated Account {account_num}: {current_email}")
+    log.info(f"Added/Updated Account {account_num}: {current_email}")
     return True
 
 def list_accounts_data():
@@ -249,14 +259,18 @@ def list_accounts_data():
         result.sort(key=lambda x: int(x["id"]))
         return result
     except Exception as e:
-        error(f"Error listing accounts: {e}")
+        log.error(f"Error listing accounts: {e}")
         return []
 
+@traced("switch", source="claude")
 def switch_account(account_id):
     """Switch to account by ID (sequence number)"""
-    # 1. Backup current first
-    if not add_account_snapshot():
-        warning("Failed to backup current account before switching. Proceeding anyway...")
+    if get_switch_mode() == SWITCH_MODE_ISOLATED:
+        return switch_account_isolated(account_id)
+
+    # 1. Backup current first (no-op when nothing changed since the last snapshot)
+    if not add_account_snapshot(only_if_changed=True):
+        log.warning("Failed to backup current account before switching. Proceeding anyway...")
     
     # 2. Read target data
     init_sequence_file()
@@ -265,7 +279,7 @@ def switch_account(account_id):
         
     account_info = data.get("accounts", {}).get(str(account_id))
     if not account_info:
-        error(f"Account {account_id} not found")
+        log.error(f"Account {account_id} not found")
         return False
         
     email = account_info.get("email")
@@ -273,7 +287,7 @@ def switch_account(account_id):
     # Read config
     config_file = BACKUP_DIR / "configs" / f".claude-config-{account_id}-{email}.json"
     if not config_file.exists():
-        error(f"Config file missing for account {account_id}")
+        log.error(f"Config file missing for account {account_id}")
         return False
         
     try:
@@ -281,30 +295,15 @@ def switch_account(account_id):
             target_config_str = f.read()
             target_config = json.loads(target_config_str)
     except Exception as e:
-        error(f"Error reading target config: {e}")
+        log.error(f"Error reading target config: {e}")
         return False
         
     # Read credentials
-    target_creds = None
-    system = platform.system()
-    if system == "Darwin":
-        try:
-            result = subprocess.run(
-                ["security", "find-generic-password", "-s", f"Claude Code-Account-{account_id}-{email}", "-w"],
-                capture_output=True, text=True
-            )
-            if result.returncode == 0:
-                target_creds = result.stdout.strip()
-        except:
-            pass
-    elif system == "Linux":
-        cred_file = BACKUP_DIR / "credentials" / f".claude-credentials-{account_id}-{email}.json"
-        if cred_file.exists():
-            with open(cred_file, 'r', encoding='utf-8') as f:
-                target_creds = f.read()
+    backend = get_credential_backend()
+    target_creds = backend.read(account_key(account_id, email)) if backend else None
                 
     if not target_creds:
-        error(f"Credentials missing for account {account_id}")
+        log.error(f"Credentials missing for account {account_id}")
         return False
         
     # 3. Apply
@@ -329,7 +328,7 @@ def switch_account(account_id):
             json.dump(live_data, f, indent=2)
             
     except Exception as e:
-        error(f"Error updating config file: {e}")
+        log.error(f"Error updating config file: {e}")
         return False
         
     # 4. Update active state
@@ -339,7 +338,7 @@ def switch_account(account_id):
     with open(SEQUENCE_FILE, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=2)
         
-    info(f"Switched to Account {account_id} ({email})")
+    log.info(f"Switched to Account {account_id} ({email})")
     return True
 
 def delete_account(account_id):
@@ -350,7 +349,7 @@ def delete_account(account_id):
         
     account_info = data.get("accounts", {}).get(str(account_id))
     if not account_info:
-        error(f"Account {account_id} not found")
+        log.error(f"Account {account_id} not found")
         return False
         
     email = account_info.get("email")
@@ -360,19 +359,9 @@ def delete_account(account_id):
     if config_file.exists():
         os.remove(config_file)
         
-    system = platform.system()
-    if system == "Darwin":
-        try:
-            subprocess.run(
-                ["security", "delete-generic-password", "-s", f"Claude Code-Account-{account_id}-{email}"],
-                check=False
-            )
-        except:
-            pass
-    elif system == "Linux":
-        cred_file = BACKUP_DIR / "credentials" / f".claude-credentials-{account_id}-{email}.json"
-        if cred_file.exists():
-            os.remove(cred_file)
+    backend = get_credential_backend()
+    if backend:
+        backend.delete(account_key(account_id, email))
             
     # Update sequence
     if str(account_id) in data.get("accounts", {}):
@@ -383,6 +372,276 @@ def delete_account(account_id):
         
     with open(SEQUENCE_FILE, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=2)
+
+    profile_dir = get_profile_dir(account_id)
+    if profile_dir.exists():
+        shutil.rmtree(profile_dir, ignore_errors=True)
         
-    info(f"Deleted Account {account_id}")
+    log.info(f"Deleted Account {account_id}")
+    return True
+
+# -------------------------------------------------------------------------
+# Isolated Mode (per-account CLAUDE_CONFIG_DIR)
+# -------------------------------------------------------------------------
+
+def get_switch_mode():
+    """Get Claude switch mode: 'shared' (swap live files) or 'isolated' (per-account dirs)"""
+    return load_settings().get("claude_switch_mode", SWITCH_MODE_SHARED)
+
+def set_switch_mode(mode):
+    """Persist Claude switch mode"""
+    if mode not in (SWITCH_MODE_SHARED, SWITCH_MODE_ISOLATED):
+        log.error(f"Unknown switch mode: {mode}")
+        return False
+    settings = load_settings()
+    settings["claude_switch_mode"] = mode
+    save_settings(settings)
+    log.info(f"Claude switch mode set to {mode}")
+    return True
+
+def get_profile_dir(account_id):
+    """Get the isolated CLAUDE_CONFIG_DIR of an account"""
+    return PROFILES_DIR / f"account-{account_id}"
+
+def ensure_profile(account_id):
+    """Make sure the isolated config dir of an account exists
+
+    The dir is seeded once from the account's backups; afterwards Claude Code
+    owns it (token refreshes, project history) and it is never overwritten.
+
+    Returns:
+        Path of the profile dir, or None on failure
+    """
+    profile_dir = get_profile_dir(account_id)
+    config_target = profile_dir / ".claude.json"
+    creds_target = profile_dir / ".credentials.json"
+    if config_target.exists() and creds_target.exists():
+        return profile_dir
+
+    if not SEQUENCE_FILE.exists():
+        log.error(f"Account {account_id} not found")
+        return None
+    with open(SEQUENCE_FILE, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    account_info = data.get("accounts", {}).get(str(account_id))
+    if not account_info:
+        log.error(f"Account {account_id} not found")
+        return None
+    email = account_info.get("email")
+
+    config_file = BACKUP_DIR / "configs" / f".claude-config-{account_id}-{email}.json"
+    backend = get_credential_backend()
+    creds = backend.read(account_key(account_id, email)) if backend else None
+    if not config_file.exists() or not creds:
+        log.error(f"Backup data missing for account {account_id}")
+        return None
+
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    os.chmod(profile_dir, 0o700)
+    if not config_target.exists():
+        shutil.copyfile(config_file, config_target)
+        os.chmod(config_target, 0o600)
+    if not creds_target.exists():
+        with open(creds_target, 'w', encoding='utf-8') as f:
+            f.write(creds)
+        os.chmod(creds_target, 0o600)
+
+    log.info(f"Created isolated profile for Account {account_id}: {profile_dir}")
+    return profile_dir
+
+def get_account_env(account_id, base_env=None):
+    """Get an environment that runs Claude Code under the given account"""
+    profile_dir = ensure_profile(account_id)
+    if not profile_dir:
+        return None
+    env = dict(os.environ if base_env is None else base_env)
+    env["CLAUDE_CONFIG_DIR"] = str(profile_dir)
+    return env
+
+def _write_launcher():
+    """Write the launcher that runs claude under the active profile (once)"""
+    if LAUNCHER_FILE.exists():
+        return
+    LAUNCHER_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(LAUNCHER_FILE, 'w', encoding='utf-8') as f:
+        f.write("#!/bin/sh\n")
+        f.write(f'. "{ACTIVE_PROFILE_FILE}"\n')
+        f.write('exec claude "$@"\n')
+    os.chmod(LAUNCHER_FILE, 0o755)
+
+def switch_account_isolated(account_id):
+    """Switch by repointing the active env profile, live files are left untouched"""
+    profile_dir = ensure_profile(account_id)
+    if not profile_dir:
+        return False
+
+    _write_launcher()
+    with open(ACTIVE_PROFILE_FILE, 'w', encoding='utf-8') as f:
+        f.write(f"export CLAUDE_CONFIG_DIR='{profile_dir}'\n")
+
+    with open(SEQUENCE_FILE, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    data["activeAccountNumber"] = int(account_id)
+    data["lastUpdated"] = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+    with open(SEQUENCE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+
+    log.info(f"Switched to Account {account_id} (isolated profile: {profile_dir})")
+    log.info(f"Run claude via {LAUNCHER_FILE} or source {ACTIVE_PROFILE_FILE}")
     return True
+
+def _get_active_isolated_email():
+    """Email of the active account in isolated mode"""
+    if not SEQUENCE_FILE.exists():
+        return None
+    try:
+        with open(SEQUENCE_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        active = data.get("activeAccountNumber")
+        if active is None:
+            return None
+        return data.get("accounts", {}).get(str(active), {}).get("email")
+    except:
+        return None
+
+def run_with_account(account_id, command):
+    """Run a command with CLAUDE_CONFIG_DIR pointing at the account's profile
+
+    Returns:
+        int: Exit code of the command (1 if it could not be started)
+    """
+    if not command:
+        log.error("No command given")
+        return 1
+    env = get_account_env(account_id)
+    if env is None:
+        return 1
+    try:
+        return subprocess.call(command, env=env)
+    except FileNotFoundError:
+        log.error(f"Command not found: {command[0]}")
+        return 127
+    except KeyboardInterrupt:
+        return 130
+
+# -------------------------------------------------------------------------
+# Config Compaction
+# -------------------------------------------------------------------------
+
+ARCHIVE_DIR = BACKUP_DIR / "archives"
+
+def _get_project_last_activity(project_path, transcripts_dir):
+    """Best-effort last activity time of a project (epoch seconds), None if unknown
+
+    Uses the project's transcript dir (~/.claude/projects/<sanitized path>),
+    falling back to the project directory itself.
+    """
+    candidates = [
+        transcripts_dir / re.sub(r'[^a-zA-Z0-9]', '-', project_path),
+        Path(project_path),
+    ]
+    for candidate in candidates:
+        try:
+            return candidate.stat().st_mtime
+        except OSError:
+            continue
+    return None
+
+def compact_config(max_age_days=90, drop_missing=True, max_history=None, config_path=None, dry_run=False):
+    """Prune stale project entries from .claude.json into a side archive
+
+    Rules (each optional):
+        max_age_days: Drop projects with no activity for this many days
+        drop_missing: Drop projects whose directory no longer exists
+        max_history:  Keep only the last N prompt history entries per project
+
+    Returns:
+        dict with removed/trimmed counts, bytes_before/bytes_after and the
+        archive path, or None on failure
+    """
+    config_path = Path(config_path) if config_path else get_claude_config_path()
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            raw = f.read()
+        config = json.loads(raw)
+    except Exception as e:
+        log.error(f"Error reading config: {e}")
+        return None
+
+    transcripts_dir = config_path.parent / "projects"
+    if not transcripts_dir.exists():
+        transcripts_dir = Path.home() / ".claude" / "projects"
+
+    projects = config.get("projects") or {}
+    cutoff = time.time() - max_age_days * 86400 if max_age_days else None
+    archived_projects = {}
+    archived_history = {}
+
+    for project_path in list(projects.keys()):
+        entry = projects[project_path]
+        exists = Path(project_path).exists()
+
+        reason = None
+        if drop_missing and not exists:
+            reason = "missing"
+        elif cutoff is not None:
+            last_activity = _get_project_last_activity(project_path, transcripts_dir)
+            if last_activity is not None and last_activity < cutoff:
+                reason = "stale"
+
+        if reason:
+            archived_projects[project_path] = entry
+            del projects[project_path]
+            log.debug(f"Pruning project ({reason}): {project_path}")
+            continue
+
+        history = entry.get("history") if isinstance(entry, dict) else None
+        if max_history is not None and isinstance(history, list) and len(history) > max_history:
+            # Newest entries come first in Claude's history list
+            archived_history[project_path] = history[max_history:]
+            entry["history"] = history[:max_history]
+
+    # Keep the file's existing layout (Claude writes it indented)
+    indent = 2 if raw.lstrip().startswith("{\n") else None
+    new_raw = json.dumps(config, indent=indent)
+    result = {
+        "removed": len(archived_projects),
+        "trimmed": len(archived_history),
+        "bytes_before": len(raw.encode('utf-8')),
+        "bytes_after": len(new_raw.encode('utf-8')),
+        "archive": None,
+    }
+
+    if not archived_projects and not archived_history:
+        log.info("Config is already compact, nothing to prune")
+        return result
+
+    if dry_run:
+        log.info(f"[dry-run] Would prune {result['removed']} projects, trim {result['trimmed']} histories, "
+             f"saving {result['bytes_before'] - result['bytes_after']} bytes")
+        return result
+
+    # Archive first, so nothing is lost if the config rewrite fails
+    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+    os.chmod(ARCHIVE_DIR, 0o700)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    archive_file = ARCHIVE_DIR / f"claude-config-{stamp}.json"
+    with open(archive_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            "source": str(config_path),
+            "created": datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "projects": archived_projects,
+            "history": archived_history,
+        }, f, indent=2)
+    os.chmod(archive_file, 0o600)
+
+    tmp_path = config_path.with_name(config_path.name + ".compact.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(new_raw)
+    shutil.copymode(config_path, tmp_path)
+    os.replace(tmp_path, config_path)
+
+    result["archive"] = str(archive_file)
+    log.info(f"Compacted {config_path}: pruned {result['removed']} projects, trimmed {result['trimmed']} histories, "
+         f"saved {result['bytes_before'] - result['bytes_after']} bytes (archive: {archive_file})")
+    return result
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import threading
+from pathlib import Path
+
+# Use relative imports
+from utils import get_logger
+from fs_watch import FileWatcher
+from credential_backend import LIVE_KEY
+import claude_manager
+
+log = get_logger("claude")
+
+# Claude writes .claude.json several times in a burst during login
+DEBOUNCE_SECONDS = 1.5
+
+
+class ClaudeConfigWatcher:
+    """Capture Claude Code logins as they happen
+
+    Watches .claude.json and .credentials.json and, once a burst of writes has
+    settled, refreshes the managed snapshot of the logged-in account. Snapshots
+    are fingerprint-checked, so unchanged state costs no writes.
+
+    Args:
+        on_account_change: Optional callback(email) fired when the logged-in
+                           account differs from the last one seen
+    """
+
+    def __init__(self, on_account_change=None, debounce=DEBOUNCE_SECONDS):
+        self.on_account_change = on_account_change
+        self.debounce = debounce
+        self.last_email = None
+        self._lock = threading.Lock()
+        self._watcher = None
+
+    def _watch_paths(self):
+        home = Path.home()
+        return [
+            home / ".claude.json",
+            home / ".claude" / ".claude.json",
+            home / ".claude" / ".credentials.json",
+        ]
+
+    def start(self):
+        if self._watcher and self._watcher.running:
+            return
+        self.last_email = claude_manager.get_current_account_email()
+        self._watcher = FileWatcher(self._watch_paths(), self._on_change, debounce=self.debounce)
+        self._watcher.start()
+        log.debug("Claude config watcher started")
+
+    def stop(self):
+        if self._watcher:
+            self._watcher.stop()
+            self._watcher = None
+
+    def _on_change(self, paths):
+        # Isolated profiles are owned by Claude itself, live files aren't tracked there
+        if claude_manager.get_switch_mode() == claude_manager.SWITCH_MODE_ISOLATED:
+            return
+
+        with self._lock:
+            log.debug(f"Claude config changed: {', '.join(p.name for p in paths)}")
+            email = claude_manager.get_current_account_email()
+            if not email:
+                return
+
+            # Credentials were written behind our back, don't trust the cache
+            backend = claude_manager.get_credential_backend()
+            if backend:
+                backend.invalidate(LIVE_KEY)
+
+            if not claude_manager.add_account_snapshot(only_if_changed=True):
+                return
+
+            if email != self.last_email:
+                log.info(f"Detected Claude login: {email}")
+                self.last_email = email
+                if self.on_account_change:
+                    self.on_account_change(email)
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+Credential storage backends for Claude Code accounts.
+
+Credentials are addressed by a logical key: LIVE_KEY for the credentials the
+Claude CLI is currently using, or account_key(num, email) for a managed backup.
+Each backend maps those keys onto its own storage (macOS keychain items, files,
+or a plain dict) and shares a short-lived read cache so repeated lookups of
+managed backups during a list/switch cycle don't hit the keychain or disk
+again. The live credentials are rewritten by Claude itself (token refresh), so
+they are never served from the cache.
+"""
+import os
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+from utils import get_logger
+
+log = get_logger("claude")
+
+LIVE_KEY = "live"
+
+# How long a read result stays valid in the in-process cache (seconds)
+CACHE_TTL = 5.0
+
+KEYCHAIN_LIVE_SERVICE = "Claude Code-credentials"
+
+
+def account_key(account_num, email):
+    """Build the logical key of a managed account backup"""
+    return f"Account-{account_num}-{email}"
+
+
+class CredentialBackend:
+    """Base class: cache handling on top of the _read/_write/_delete hooks
+
+    Subclasses only implement the single-item storage hooks. _cache_stamp can
+    be overridden to tie cache entries to the state of the underlying storage.
+    """
+
+    def __init__(self, cache_ttl=CACHE_TTL):
+        self.cache_ttl = cache_ttl
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    # ---------------------------------------------------------------------
+    # Cache
+    # ---------------------------------------------------------------------
+
+    def _cache_get(self, key):
+        if key == LIVE_KEY:
+            return False, None
+        stamp = self._cache_stamp(key)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry and time.monotonic() - entry[1] < self.cache_ttl and entry[2] == stamp:
+                return True, entry[0]
+            return False, None
+
+    def _cache_put(self, key, value):
+        if key == LIVE_KEY:
+            return
+        stamp = self._cache_stamp(key)
+        with self._lock:
+            self._cache[key] = (value, time.monotonic(), stamp)
+
+    def invalidate(self, key=None):
+        """Drop one cached key, or the whole cache if key is None"""
+        with self._lock:
+            if key is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(key, None)
+
+    # ---------------------------------------------------------------------
+    # Public API
+    # ---------------------------------------------------------------------
+
+    def read(self, key):
+        """Read credentials for key, returns None if missing"""
+        hit, value = self._cache_get(key)
+        if hit:
+            return value
+        value = self._read(key)
+        self._cache_put(key, value)
+        return value
+
+    def write(self, key, credentials):
+        """Write credentials for key, returns bool"""
+        if not credentials:
+            return False
+        if not self._write(key, credentials):
+            self.invalidate(key)
+            return False
+        self._cache_put(key, credentials)
+        return True
+
+    def delete(self, key):
+        """Delete credentials for key, returns bool"""
+        self.invalidate(key)
+        return self._delete(key)
+
+    # ---------------------------------------------------------------------
+    # Storage hooks
+    # ---------------------------------------------------------------------
+
+    def _read(self, key):
+        raise NotImplementedError
+
+    def _write(self, key, credentials):
+        raise NotImplementedError
+
+    def _delete(self, key):
+        raise NotImplementedError
+
+    def _cache_stamp(self, key):
+        """Storage state a cache entry is valid for (None = TTL only)"""
+        return None
+
+
+class KeychainBackend(CredentialBackend):
+    """macOS keychain via the `security` CLI"""
+
+    def __init__(self, cache_ttl=CACHE_TTL, user=None):
+        super().__init__(cache_ttl)
+        self.user = user or os.environ.get("USER", "unknown")
+
+    def _service(self, key):
+        if key == LIVE_KEY:
+            return KEYCHAIN_LIVE_SERVICE
+        return f"Claude Code-{key}"
+
+    def _read(self, key):
+        try:
+            result = subprocess.run(
+                ["security", "find-generic-password", "-s", self._service(key), "-w"],
+                capture_output=True, text=True
+            )
+            if result.returncode == 0:
+                return result.stdout.strip()
+        except Exception as e:
+            log.error(f"Error reading credentials: {e}")
+        return None
+
+    def _write(self, key, credentials):
+        try:
+            subprocess.run(
+                ["security", "add-generic-password", "-U", "-s", self._service(key), "-a", self.user, "-w", credentials],
+                check=True
+            )
+            return True
+        except Exception as e:
+            log.error(f"Error writing credentials: {e}")
+            return False
+
+    def _delete(self, key):
+        try:
+            subprocess.run(
+                ["security", "delete-generic-password", "-s", self._service(key)],
+                capture_output=True, check=False
+            )
+            return True
+        except Exception:
+            return False
+
+
+class FileBackend(CredentialBackend):
+    """Plain files with 0600 permissions (Linux, or any platform in tests/benchmarks)
+
+    Both locations are injectable so the backend can run against a temp dir.
+    """
+
+    def __init__(self, live_path=None, backup_dir=None, cache_ttl=CACHE_TTL):
+        super().__init__(cache_ttl)
+        self.live_path = Path(live_path) if live_path else Path.home() / ".claude" / ".credentials.json"
+        self.backup_dir = Path(backup_dir) if backup_dir else Path.home() / ".claude-switch-backup" / "credentials"
+
+    def path_for(self, key):
+        if key == LIVE_KEY:
+            return self.live_path
+        # Keep the historical file naming: .claude-credentials-{num}-{email}.json
+        return self.backup_dir / f".claude-credentials-{key[len('Account-'):]}.json"
+
+    def _cache_stamp(self, key):
+        # Files can be changed behind our back, a cached read is only valid
+        # while the file is unchanged
+        try:
+            st = os.stat(self.path_for(key))
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _read(self, key):
+        path = self.path_for(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log.error(f"Error reading credentials: {e}")
+            return None
+
+    def _write(self, key, credentials):
+        path = self.path_for(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(credentials)
+            os.chmod(path, 0o600)
+            return True
+        except Exception as e:
+            log.error(f"Error writing credentials: {e}")
+            return False
+
+    def _delete(self, key):
+        path = self.path_for(key)
+        try:
+            if path.exists():
+                os.remove(path)
+            return True
+        except Exception as e:
+            log.error(f"Error deleting credentials: {e}")
+            return False
+
+
+class MemoryBackend(CredentialBackend):
+    """In-memory storage, for tests and dry runs"""
+
+    def __init__(self, initial=None, cache_ttl=CACHE_TTL):
+        super().__init__(cache_ttl)
+        self.store = dict(initial or {})
+
+    def _read(self, key):
+        return self.store.get(key)
+
+    def _write(self, key, credentials):
+        self.store[key] = credentials
+        return True
+
+    def _delete(self, key):
+        self.store.pop(key, None)
+        return True
+
+
+def create_default_backend(system, backup_dir=None):
+    """Pick the backend for a platform.system() value, None if unsupported"""
+    if system == "Darwin":
+        return KeychainBackend()
+    elif system == "Linux":
+        return FileBackend(backup_dir=backup_dir)
+    return None
@@ -5,7 +5,9 @@ import os
 from datetime import datetime
 
 # Use relative imports
-from utils import info, error, warning, debug, get_antigravity_db_paths
+from utils import get_logger, get_antigravity_db_paths
+
+log = get_logger("antigravity")
 
 # List of keys to backup
 KEYS_TO_BACKUP = [
@@ -21,28 +23,28 @@ def get_db_connection(db_path):
     except sqlite3.Error as e:
         error_msg = str(e)
         if "locked" in error_msg.lower():
-            error(f"Database is locked: {e}")
-            error("Tip: Please ensure Antigravity app is fully closed")
+            log.error(f"Database is locked: {e}")
+            log.error("Tip: Please ensure Antigravity app is fully closed")
         else:
-            error(f"Failed to connect to database: {e}")
+            log.error(f"Failed to connect to database: {e}")
         return None
     except Exception as e:
-        error(f"Unexpected error connecting to database: {e}")
+        log.error(f"Unexpected error connecting to database: {e}")
         return None
 
 def backup_account(email, backup_file_path):
     """Backup account data to JSON file"""
     db_paths = get_antigravity_db_paths()
     if not db_paths:
-        error("Antigravity database path not found")
+        log.error("Antigravity database path not found")
         return False
     
     db_path = db_paths[0]
     if not db_path.exists():
-        error(f"Database file does not exist: {db_path}")
+        log.error(f"Database file does not exist: {db_path}")
         return False
         
-    info(f"Backing up data from database: {db_path}")
+    log.info(f"Backing up data from database: {db_path}")
     conn = get_db_connection(db_path)
     if not conn:
         return False
@@ -57,9 +59,9 @@ def backup_account(email, backup_file_path):
             row = cursor.fetchone()
             if row:
                 data_map[key] = row[0]
-                debug(f"Backing up key: {key}")
+                log.debug(f"Backing up key: {key}")
             else:
-                debug(f"Key not found: {key}")
+                log.debug(f"Key not found: {key}")
         
         # 3. Add metadata
         data_map["account_email"] = email
@@ -69,14 +71,14 @@ def backup_account(email, backup_file_path):
         with open(backup_file_path, 'w', encoding='utf-8') as f:
             json.dump(data_map, f, ensure_ascii=False, indent=2)
             
-        info(f"Backup successful: {backup_file_path}")
+        log.info(f"Backup successful: {backup_file_path}")
         return True
         
     except sqlite3.Error as e:
-        error(f"Database query error: {e}")
+        log.error(f"Database query error: {e}")
         return False
     except Exception as e:
-        error(f"Backup process error: {e}")
+        log.error(f"Backup process error: {e}")
         return False
     finally:
         conn.close()
@@ -84,19 +86,19 @@ def backup_account(email, backup_file_path):
 def restore_account(backup_file_path):
     """Restore account data from JSON file"""
     if not os.path.exists(backup_file_path):
-        error(f"Backup file not found: {backup_file_path}")
+        log.error(f"Backup file not found: {backup_file_path}")
         return False
         
     try:
         with open(backup_file_path, 'r', encoding='utf-8') as f:
             backup_data = json.load(f)
     except Exception as e:
-        error(f"Failed to read backup file: {e}")
+        log.error(f"Failed to read backup file: {e}")
         return False
         
     db_paths = get_antigravity_db_paths()
     if not db_paths:
-        error("Antigravity database path not found")
+        log.error("Antigravity database path not found")
         return False
     
     # Usually two DB files: state.vscdb and state.vscdb.backup
@@ -121,7 +123,7 @@ def _restore_single_db(db_path, backup_data):
     if not db_path.exists():
         return False
         
-    info(f"Restoring database: {db_path}")
+    log.info(f"Restoring database: {db_path}")
     conn = get_db_connection(db_path)
     if not conn:
         return False
@@ -140,17 +142,17 @@ def _restore_single_db(db_path, backup_data):
                     
                 cursor.execute("INSERT OR REPLACE INTO ItemTable (key, value) VALUES (?, ?)", (key, value))
                 restored_keys.append(key)
-                debug(f"Restoring key: {key}")
+                log.debug(f"Restoring key: {key}")
 
         conn.commit()
-        info(f"Database restore complete: {db_path}")
+        log.info(f"Database restore complete: {db_path}")
         return True
         
     except sqlite3.Error as e:
-        error(f"Database write error: {e}")
+        log.error(f"Database write error: {e}")
         return False
     except Exception as e:
-        error(f"Restore process error: {e}")
+        log.error(f"Restore process error: {e}")
         return False
     finally:
         conn.close()
@@ -214,7 +216,7 @@ def get_current_account_info():
         return None
         
     except Exception as e:
-        error(f"Error extracting account info: {e}")
+        log.error(f"Error extracting account info: {e}")
         return None
     finally:
         conn.close()
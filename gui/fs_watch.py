@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+Debounced file watcher.
+
+Uses inotify (via ctypes, no extra dependency) on Linux and falls back to
+polling stat() elsewhere. Watched files are tracked through their parent
+directory so atomic replace-by-rename writes are seen as well.
+"""
+import ctypes
+import ctypes.util
+import os
+import platform
+import select
+import struct
+import threading
+import time
+from pathlib import Path
+
+from utils import debug, warning
+
+# inotify constants (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_EVENT_HEADER = struct.Struct("iIII")
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+
+def _load_inotify():
+    """Load libc inotify functions, None if unavailable"""
+    if platform.system() != "Linux":
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class FileWatcher:
+    """Watch files and directories, call on_change(paths) once writes settle
+
+    Args:
+        paths: Files or directories to watch. For a directory, any file inside
+               it is reported.
+        on_change: Callback receiving the set of changed Paths
+        debounce: Quiet period (seconds) after the last event before firing
+        poll_interval: stat() interval when inotify is unavailable
+    """
+
+    def __init__(self, paths, on_change, debounce=1.0, poll_interval=2.0):
+        self.paths = [Path(p) for p in paths]
+        self.on_change = on_change
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        self._thread = None
+
+    # ---------------------------------------------------------------------
+    # Internals
+    # ---------------------------------------------------------------------
+
+    def _targets(self):
+        """Map watched directory -> set of file names (None = any file)"""
+        targets = {}
+        for path in self.paths:
+            if path.is_dir():
+                targets[path] = None
+            else:
+                names = targets.setdefault(path.parent, set())
+                if names is not None:
+                    names.add(path.name)
+        return targets
+
+    def _run(self):
+        libc = _load_inotify()
+        if libc:
+            try:
+                self._run_inotify(libc)
+                return
+            except OSError as e:
+                warning(f"inotify unavailable ({e}), falling back to polling")
+        self._run_polling()
+
+    def _fire(self, pending):
+        try:
+            self.on_change(set(pending))
+        except Exception as e:
+            warning(f"File watcher callback failed: {e}")
+
+    def _run_inotify(self, libc):
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        try:
+            targets = self._targets()
+            watches = {}
+            for directory, names in targets.items():
+                if not directory.exists():
+                    continue
+                wd = libc.inotify_add_watch(fd, os.fsencode(str(directory)), _WATCH_MASK)
+                if wd >= 0:
+                    watches[wd] = (directory, names)
+            if not watches:
+                raise OSError(0, "no watchable directories")
+            debug(f"Watching {len(watches)} directories via inotify")
+
+            pending = set()
+            deadline = None
+            while not self._stop.is_set():
+                timeout = 0.5 if deadline is None else max(0.0, min(0.5, deadline - time.monotonic()))
+                readable, _, _ = select.select([fd], [], [], timeout)
+                if readable:
+                    try:
+                        buf = os.read(fd, 64 * 1024)
+                    except BlockingIOError:
+                        buf = b""
+                    offset = 0
+                    while offset + _EVENT_HEADER.size <= len(buf):
+                        wd, _mask, _cookie, length = _EVENT_HEADER.unpack_from(buf, offset)
+                        offset += _EVENT_HEADER.size
+                        name = buf[offset:offset + length].split(b"\0", 1)[0].decode("utf-8", "replace")
+                        offset += length
+                        watch = watches.get(wd)
+                        if not watch or not name:
+                            continue
+                        directory, names = watch
+                        if names is None or name in names:
+                            pending.add(directory / name)
+                            deadline = time.monotonic() + self.debounce
+                if deadline is not None and time.monotonic() >= deadline:
+                    self._fire(pending)
+                    pending.clear()
+                    deadline = None
+        finally:
+            os.close(fd)
+
+    def _stat_all(self):
+        state = {}
+        for directory, names in self._targets().items():
+            if names is None:
+                try:
+                    candidates = [p for p in directory.iterdir() if p.is_file()]
+                except OSError:
+                    candidates = []
+            else:
+                candidates = [directory / name for name in names]
+            for path in candidates:
+                try:
+                    st = path.stat()
+                    state[path] = (st.st_mtime_ns, st.st_size)
+                except OSError:
+                    state[path] = None
+        return state
+
+    def _run_polling(self):
+        last = self._stat_all()
+        pending = set()
+        deadline = None
+        while not self._stop.wait(self.poll_interval if deadline is None else min(self.poll_interval, self.debounce)):
+            current = self._stat_all()
+            changed = {p for p in set(last) | set(current) if last.get(p) != current.get(p)}
+            last = current
+            if changed:
+                pending |= changed
+                deadline = time.monotonic() + self.debounce
+            elif deadline is not None and time.monotonic() >= deadline:
+                self._fire(pending)
+                pending.clear()
+                deadline = None
@@ -52,6 +52,7 @@ class AppIcons:
     # File & Folder Icons
     folder = ft.CupertinoIcons.FOLDER_SOLID if _is_macos else ft.Icons.FOLDER
     document = ft.CupertinoIcons.DOC_TEXT_SEARCH if _is_macos else ft.Icons.SEARCH
+    search = ft.CupertinoIcons.SEARCH if _is_macos else ft.Icons.SEARCH
 
     # Menu & More Icons
     ellipsis = ft.CupertinoIcons.ELLIPSIS if _is_macos else ft.Icons.MORE_VERT
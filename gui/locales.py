@@ -60,6 +60,11 @@ class Locales:
         "about": "About",
         "author": "Author",
         "app_title": "AI Tools Manager",
+        "isolated_mode": "Isolated Profiles",
+        "isolated_mode_desc": "Give each account its own config dir; switching only repoints the launcher",
+        "search_logs": "Search logs (buffer and app.log)",
+        "search_no_results": "No matches",
+        "back_to_live": "Back to live log",
     }
 
     vi = {
@@ -122,6 +127,11 @@ class Locales:
         "profiles_location": "Vị trí lưu trữ hồ sơ",
         "about": "Giới thiệu",
         "author": "Tác giả",
+        "isolated_mode": "Hồ sơ tách biệt",
+        "isolated_mode_desc": "Mỗi tài khoản có thư mục cấu hình riêng; chuyển đổi chỉ trỏ lại trình khởi chạy",
+        "search_logs": "Tìm trong nhật ký (bộ đệm và app.log)",
+        "search_no_results": "Không có kết quả",
+        "back_to_live": "Quay lại nhật ký trực tiếp",
     }
 
     ja = {
@@ -188,6 +198,11 @@ class Locales:
         "open_file": "ファイルを開く",
         "about": "アプリについて",
         "author": "作者",
+        "isolated_mode": "分離プロファイル",
+        "isolated_mode_desc": "アカウントごとに専用の設定ディレクトリを使用し、切り替え時はランチャーのみを変更します",
+        "search_logs": "ログを検索（バッファと app.log）",
+        "search_no_results": "一致なし",
+        "back_to_live": "ライブログに戻る",
     }
 
     @staticmethod
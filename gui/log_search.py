@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+Full-text search over log lines.
+
+LogIndex is an inverted token index maintained as lines arrive in the Logs
+view (and trimmed as they are evicted), so searching the in-memory buffer
+never walks the lines themselves. search_files streams matches from app.log
+and its rotated segments in batches for everything older than the buffer.
+
+A query matches a line when every query token is a substring of one of the
+line's tokens (case-insensitive), so partially typed words already match.
+"""
+import re
+import threading
+
+from log_tail import open_log_bytes
+from utils import get_log_file_path, get_log_segments, record_from_json
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Disk matches handed to the caller at once
+SEARCH_BATCH = 50
+
+
+def tokenize(text):
+    return set(TOKEN_RE.findall(text.lower()))
+
+
+class LogIndex:
+    """Inverted index: token -> keys of the lines containing it"""
+
+    def __init__(self):
+        self._postings = {}
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def add(self, key, text):
+        tokens = tokenize(text)
+        with self._lock:
+            self._tokens[key] = tokens
+            for token in tokens:
+                posting = self._postings.get(token)
+                if posting is None:
+                    posting = self._postings[token] = set()
+                posting.add(key)
+
+    def remove(self, key):
+        with self._lock:
+            for token in self._tokens.pop(key, ()):
+                posting = self._postings.get(token)
+                if posting is not None:
+                    posting.discard(key)
+                    if not posting:
+                        del self._postings[token]
+
+    def clear(self):
+        with self._lock:
+            self._postings.clear()
+            self._tokens.clear()
+
+    def search(self, query):
+        """Keys of the lines matching every token of query
+
+        A term matches any token containing it, so each term walks the whole
+        token vocabulary under the lock: O(vocabulary) per term. The index
+        only covers the in-memory buffer (LogsView's line cap), which keeps
+        the vocabulary small; on-disk history is searched by search_files.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return set()
+        with self._lock:
+            result = None
+            # Most selective (longest) terms first to shrink the candidate set early
+            for term in sorted(terms, key=len, reverse=True):
+                keys = set()
+                for token, posting in self._postings.items():
+                    if term in token:
+                        keys |= posting
+                result = keys if result is None else result & keys
+                if not result:
+                    return set()
+            return result
+
+
+def search_sources():
+    """Log files searched on disk, oldest first"""
+    sources = list(get_log_segments())
+    log_file = get_log_file_path()
+    if log_file and log_file.exists():
+        sources.append(log_file)
+    return sources
+
+
+def search_files(query, cancel=None, batch=SEARCH_BATCH, sources=None):
+    """Stream disk matches of query as lists of (path, offset, line_no, record)
+
+    Args:
+        cancel: threading.Event that stops the scan early
+    """
+    terms = [term.encode("utf-8") for term in tokenize(query)]
+    if not terms:
+        return
+    hits = []
+    for path in (search_sources() if sources is None else sources):
+        try:
+            f = open_log_bytes(path)
+        except OSError:
+            continue
+        with f:
+            offset = 0
+            for line_no, raw in enumerate(f, 1):
+                line_offset = offset
+                offset += len(raw)
+                if cancel is not None and line_no % 1000 == 0 and cancel.is_set():
+                    return
+                lowered = raw.lower()
+                if not all(term in lowered for term in terms):
+                    continue
+                record = record_from_json(raw.decode("utf-8", "replace"))
+                # The JSON keys themselves ("level", "msg", ...) must not count as hits
+                if record is None or not all(term.decode("utf-8") in record.message.lower() for term in terms):
+                    continue
+                hits.append((path, line_offset, line_no, record))
+                if len(hits) >= batch:
+                    yield hits
+                    hits = []
+    if hits:
+        yield hits
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Reverse reading of app.log for the Logs view.
+
+History is read backwards from the end of the file in fixed-size chunks, so
+the cost of a page depends on the page size, not on the size of the log.
+Once app.log is exhausted, paging continues into the rotated segments
+(newest first); a gzip segment is decompressed once, it is capped at the
+rotation size.
+"""
+import gzip
+import io
+import os
+
+from utils import get_log_file_path, get_log_segments, record_from_json
+
+CHUNK_SIZE = 64 * 1024
+
+
+def read_lines_backward(f, end, count, chunk_size=CHUNK_SIZE):
+    """Read up to count complete lines ending at byte offset end
+
+    Returns:
+        (lines, start): lines oldest first (bytes, without newline) and the
+        offset where the first returned line starts (0 = beginning reached)
+    """
+    lines = []
+    buf = b""
+    pos = end
+    start = end
+    while len(lines) < count:
+        if pos == 0:
+            # What is left is the first line of the file
+            if buf:
+                lines.append(buf)
+            start = 0
+            break
+        step = min(chunk_size, pos)
+        pos -= step
+        f.seek(pos)
+        buf = f.read(step) + buf
+        # Everything after a newline is complete; the head may still be cut
+        while len(lines) < count:
+            idx = buf.rfind(b"\n")
+            if idx < 0:
+                break
+            line = buf[idx + 1:]
+            buf = buf[:idx]
+            start = pos + idx + 1
+            if line:
+                lines.append(line)
+    lines.reverse()
+    return lines, start
+
+
+def open_log_bytes(path):
+    """Binary file object of a log file, gzip segments decompressed in memory"""
+    if str(path).endswith(".gz"):
+        try:
+            with gzip.open(path, "rb") as f:
+                return io.BytesIO(f.read())
+        except EOFError:
+            return io.BytesIO(b"")
+    return open(path, "rb")
+
+
+def read_context(path, offset, before=50, after=50):
+    """Records around the line starting at offset
+
+    Returns:
+        (records, hit): records oldest first and the index of the line at offset
+        (None if it could not be parsed)
+    """
+    with open_log_bytes(path) as f:
+        lines, _ = read_lines_backward(f, offset, before)
+        f.seek(offset)
+        following = []
+        for _ in range(after + 1):
+            raw = f.readline()
+            if not raw:
+                break
+            following.append(raw.rstrip(b"\n"))
+
+    records = []
+    hit = None
+    for i, line in enumerate(lines + following):
+        record = record_from_json(line.decode("utf-8", "replace"))
+        if record is None:
+            continue
+        if i == len(lines):
+            hit = len(records)
+        records.append(record)
+    return records, hit
+
+
+class LogHistory:
+    """Pages of older log records, newest page first
+
+    Args:
+        path: Log file (default app.log); rotated segments follow it
+        end: Offset to start reading backwards from (default: current size)
+    """
+
+    def __init__(self, path=None, end=None, include_segments=True):
+        self.path = path or get_log_file_path()
+        self._sources = []
+        if self.path and os.path.exists(self.path):
+            size = os.path.getsize(self.path)
+            self._sources.append([self.path, min(size, end) if end is not None else size])
+        if include_segments and path is None:
+            for segment in reversed(get_log_segments()):
+                self._sources.append([segment, None])
+        self._buffers = {}
+
+    @property
+    def exhausted(self):
+        return not self._sources
+
+    def _open(self, source):
+        path = source[0]
+        if str(path).endswith(".gz"):
+            data = self._buffers.get(path)
+            if data is None:
+                try:
+                    with open_log_bytes(path) as f:
+                        data = f.getvalue()
+                except OSError:
+                    data = b""
+                self._buffers[path] = data
+            if source[1] is None:
+                source[1] = len(data)
+            return io.BytesIO(data)
+        f = open(path, "rb")
+        if source[1] is None:
+            source[1] = os.path.getsize(path)
+        return f
+
+    def older(self, count=200):
+        """Next page of up to count LogRecords (oldest first), [] when exhausted"""
+        records = []
+        while self._sources and len(records) < count:
+            source = self._sources[0]
+            try:
+                with self._open(source) as f:
+                    lines, start = read_lines_backward(f, source[1], count - len(records))
+            except OSError:
+                lines, start = [], 0
+            page = []
+            for line in lines:
+                record = record_from_json(line.decode("utf-8", "replace"))
+                if record:
+                    page.append(record)
+            records = page + records
+            source[1] = start
+            if start == 0:
+                self._sources.pop(0)
+                self._buffers.pop(source[0], None)
+        return records
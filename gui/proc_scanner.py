@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Process table scanners for process_manager.
+
+A scan only collects pid + name for every process; everything else (exe,
+cmdline, ppid, create_time) is loaded lazily the first time a matcher asks
+for it, so only name-prefiltered candidates pay for the expensive lookups.
+
+- Linux: reads /proc/<pid>/comm directly (one small read per process)
+- Elsewhere: psutil.process_iter(["name"])
+"""
+import os
+import platform
+
+import psutil
+
+PROC_ROOT = "/proc"
+
+
+class LazyInfo(dict):
+    """proc.info compatible dict that loads missing attributes on first access"""
+
+    def __init__(self, loader, **known):
+        super().__init__(known)
+        self._loader = loader
+
+    def __missing__(self, key):
+        value = self._loader(key)
+        self[key] = value
+        return value
+
+    def get(self, key, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None else value
+
+
+# -------------------------------------------------------------------------
+# Linux /proc backend
+# -------------------------------------------------------------------------
+
+_clock_ticks = None
+
+
+def _get_clock_ticks():
+    global _clock_ticks
+    if _clock_ticks is None:
+        try:
+            _clock_ticks = os.sysconf("SC_CLK_TCK")
+        except (ValueError, OSError, AttributeError):
+            _clock_ticks = 100
+    return _clock_ticks
+
+
+class ProcEntry:
+    """One /proc process: pid + comm up front, the rest read on demand"""
+
+    __slots__ = ("pid", "info")
+
+    def __init__(self, pid, name):
+        self.pid = pid
+        self.info = LazyInfo(self._load, pid=pid, name=name)
+
+    def _path(self, leaf):
+        return f"{PROC_ROOT}/{self.pid}/{leaf}"
+
+    def _load(self, key):
+        if key == "exe":
+            try:
+                return os.readlink(self._path("exe"))
+            except FileNotFoundError:
+                if not os.path.exists(self._path("")):
+                    raise psutil.NoSuchProcess(self.pid)
+                return None
+            except OSError:
+                # Kernel threads / other users' processes
+                return None
+        if key == "cmdline":
+            try:
+                with open(self._path("cmdline"), "rb") as f:
+                    raw = f.read()
+            except FileNotFoundError:
+                raise psutil.NoSuchProcess(self.pid)
+            except OSError:
+                return None
+            return [arg.decode("utf-8", "replace") for arg in raw.split(b"\0") if arg]
+        if key in ("ppid", "create_time"):
+            self._load_stat()
+            return dict.get(self.info, key)
+        raise KeyError(key)
+
+    def _load_stat(self):
+        try:
+            with open(self._path("stat"), "rb") as f:
+                raw = f.read()
+        except OSError:
+            raise psutil.NoSuchProcess(self.pid)
+        # comm may contain spaces/parens, fields start after the last ')'
+        fields = raw[raw.rfind(b")") + 2:].split()
+        self.info["ppid"] = int(fields[1])
+        self.info["create_time"] = int(fields[19]) / _get_clock_ticks() + psutil.boot_time()
+
+    def process(self):
+        """Get a psutil.Process for acting on this entry (terminate, kill, ...)
+
+        Raises psutil.NoSuchProcess if the PID was reused since the scan.
+        """
+        proc = psutil.Process(self.pid)
+        if abs(proc.create_time() - self.info["create_time"]) > 0.05:
+            raise psutil.NoSuchProcess(self.pid)
+        proc.info = self.info
+        return proc
+
+
+def scan_proc():
+    """Scan /proc, reading only comm for every process"""
+    entries = []
+    for name in os.listdir(PROC_ROOT):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"{PROC_ROOT}/{name}/comm", "rb") as f:
+                comm = f.read().rstrip(b"\n").decode("utf-8", "replace")
+        except OSError:
+            continue
+        entries.append(ProcEntry(int(name), comm))
+    return entries
+
+
+# -------------------------------------------------------------------------
+# psutil backend
+# -------------------------------------------------------------------------
+
+def _psutil_loader(proc):
+    def load(key):
+        return proc.as_dict(attrs=[key]).get(key)
+    return load
+
+
+def scan_psutil():
+    """Scan via psutil, fetching only names up front"""
+    entries = []
+    for proc in psutil.process_iter(["name"]):
+        proc.info = LazyInfo(_psutil_loader(proc), pid=proc.pid, name=proc.info.get("name"))
+        entries.append(proc)
+    return entries
+
+
+def to_process(entry):
+    """Turn a scan entry into a psutil.Process carrying the same .info"""
+    if isinstance(entry, psutil.Process):
+        return entry
+    return entry.process()
+
+
+def get_default_scanner():
+    """Pick the fastest scanner for this platform"""
+    if platform.system() == "Linux" and os.path.isdir(PROC_ROOT):
+        return scan_proc
+    return scan_psutil
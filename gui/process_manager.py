@@ -1,56 +1,635 @@
 # -*- coding: utf-8 -*-
+import fnmatch
 import os
 import platform
+import re
+import select
 import subprocess
+import sys
+import threading
 import time
+from collections import deque, namedtuple
 
 import psutil
 
 # Use relative imports
-from utils import error, get_antigravity_executable_path, info, open_uri, warning
+from proc_scanner import get_default_scanner, to_process
+from utils import debug, error, get_antigravity_db_paths, get_app_data_dir, get_antigravity_executable_path, info, load_settings, open_uri, traced, warning
 
+# How long one process table scan is shared between callers (seconds)
+SNAPSHOT_TTL = 1.0
 
-def is_process_running(process_name=None):
+# Full rescan interval while pinned PIDs are still alive (seconds)
+RECONCILE_INTERVAL = 30.0
+
+# Upper bounds for close stages without history (seconds)
+GRACEFUL_EXIT_TIMEOUT = 5.0
+KILL_WAIT_TIMEOUT = 3.0
+MIN_STAGE_TIMEOUT = 2.0
+
+# Weight of the newest sample in the per-stage exit time average
+EXIT_TIME_ALPHA = 0.3
+
+# Observed exit time per close stage (seconds), sizes the next stage's wait
+_exit_time_stats = {}
+
+# Poll interval of wait_ready while the app starts up (seconds)
+READY_POLL_INTERVAL = 0.25
+
+# Resource samples kept per app (at the GUI's 2s interval: 5 minutes)
+RESOURCE_HISTORY = 150
+
+class ProcessTable:
+    """Shared, TTL-cached snapshot of the process table
+
+    One scan serves every matcher (Antigravity, Claude, ...) until the snapshot
+    is older than the TTL. Callers that must see the live state (e.g. right
+    before killing) pass max_age=0. The scan itself only collects names, see
+    proc_scanner for the lazy loading of the other attributes.
+    """
+
+    def __init__(self, ttl=SNAPSHOT_TTL, scanner=None):
+        self.ttl = ttl
+        self.scanner = scanner or get_default_scanner()
+        self._procs = []
+        self._taken_at = None
+        self._children = {}
+        self._children_for = None
+        self._lock = threading.Lock()
+        self.last_scan_duration = 0.0
+        self.scan_count = 0
+
+    def snapshot(self, max_age=None):
+        """Get scan entries (pid + lazy .info), rescanning if stale"""
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            now = time.monotonic()
+            if self._taken_at is None or now - self._taken_at > max_age:
+                start = time.perf_counter()
+                self._procs = self.scanner()
+                self.last_scan_duration = time.perf_counter() - start
+                self._taken_at = time.monotonic()
+                self.scan_count += 1
+            return self._procs
+
+    def find(self, matcher, max_age=None):
+        """Get psutil.Process objects (with .info) of entries accepted by matcher(entry)"""
+        result = []
+        for entry in self.snapshot(max_age):
+            try:
+                if matcher(entry):
+                    result.append(to_process(entry))
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return result
+
+    def children_map(self, max_age=None):
+        """Map ppid -> child scan entries, built once per snapshot"""
+        procs = self.snapshot(max_age)
+        with self._lock:
+            if self._children_for is not procs:
+                children = {}
+                for entry in procs:
+                    try:
+                        ppid = entry.info.get("ppid")
+                    except (psutil.NoSuchProcess, psutil.AccessDenied):
+                        continue
+                    if ppid is not None:
+                        children.setdefault(ppid, []).append(entry)
+                self._children = children
+                self._children_for = procs
+            return self._children
+
+    def invalidate(self):
+        with self._lock:
+            self._taken_at = None
+
+    def stats(self):
+        """Scan timing info, for diagnostics"""
+        return {
+            "last_scan_duration": self.last_scan_duration,
+            "scan_count": self.scan_count,
+            "process_count": len(self._procs),
+        }
+
+
+_process_table = ProcessTable()
+
+
+def get_process_table():
+    """Get the shared process table snapshot service"""
+    return _process_table
+
+
+class PidTracker:
+    """Remember matched PIDs so liveness checks don't need a table scan
+
+    PIDs are pinned together with their create_time, which guards against the
+    OS reusing a PID for an unrelated process. A check probes the pinned PIDs
+    directly (O(1) each) and only falls back to a full scan when every pinned
+    PID has died, or when the periodic reconciliation is due.
+    """
+
+    def __init__(self, matcher, reconcile_interval=None):
+        self.matcher = matcher
+        self.reconcile_interval = RECONCILE_INTERVAL if reconcile_interval is None else reconcile_interval
+        self._pids = {}
+        self._last_reconcile = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _alive(pid, create_time):
+        try:
+            proc = psutil.Process(pid)
+            return abs(proc.create_time() - create_time) < 0.01 and proc.status() != psutil.STATUS_ZOMBIE
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return False
+
+    def track(self, procs):
+        """Pin processes found elsewhere (e.g. by a close scan)"""
+        with self._lock:
+            for proc in procs:
+                create_time = proc.info.get("create_time") if hasattr(proc, "info") else None
+                if create_time is not None:
+                    self._pids[proc.pid] = create_time
+
+    def reset(self):
+        with self._lock:
+            self._pids.clear()
+            self._last_reconcile = None
+
+    def pids(self):
+        with self._lock:
+            return list(self._pids)
+
+    def is_running(self, max_age=None):
+        """max_age: snapshot age accepted when a scan is needed (None = table TTL)"""
+        with self._lock:
+            now = time.monotonic()
+            reconcile_due = self._last_reconcile is None or now - self._last_reconcile > self.reconcile_interval
+            had_pids = bool(self._pids)
+
+            if had_pids and not reconcile_due:
+                for pid, create_time in list(self._pids.items()):
+                    if self._alive(pid, create_time):
+                        return True
+                    del self._pids[pid]
+
+            # Nothing pinned, a pinned PID died, or reconciliation is due
+            if had_pids:
+                max_age = 0
+            procs = _process_table.find(self.matcher, max_age=max_age)
+            self._pids = {
+                proc.pid: proc.info["create_time"]
+                for proc in procs
+                if proc.info.get("create_time") is not None
+            }
+            self._last_reconcile = now
+            return bool(procs)
+
+
+# Declarative process matching rules, one per app. A process matches when its
+# name passes the prefilter and it is accepted by names, exe_globs or
+# cmdline_patterns, unless an exclude_* entry or the self exclusion rejects it.
+# exclude_self: True skips the manager's own PID and anything started from its
+# directory, "pid" only the own PID (the directory of a dev interpreter, e.g.
+# /usr/bin, may also hold a node running Claude).
+# "platforms" holds per-platform.system() overrides. Users can override any key
+# per app through "process_rules" in settings.json.
+PROCESS_RULES = {
+    "antigravity": {
+        # Helpers share the app's name on every platform (Antigravity Helper (GPU), ...),
+        # crashpad handlers live in the install dir
+        "prefilter": r"antigravity|crashpad",
+        "names": ["antigravity", "antigravity.exe"],
+        "exe_globs": ["*antigravity*"],
+        "cmdline_patterns": [],
+        # The manager's own executables (AI Tools Manager.exe, ...) sit next to the app
+        "exclude_names": ["*manager*"],
+        "exclude_exe_globs": [],
+        "exclude_cmdline": [],
+        "exclude_self": True,
+        "platforms": {
+            # macOS: only processes inside Antigravity.app
+            "Darwin": {"names": [], "exe_globs": ["*/antigravity.app/*"]},
+        },
+    },
+    "claude": {
+        # Native installs run as "claude", npm installs as node/bun running the CLI script
+        "prefilter": r"claude|node|bun",
+        "names": ["claude", "claude.exe"],
+        "exe_globs": ["*/.claude/local/*", "*/@anthropic-ai/claude-code/*"],
+        "cmdline_patterns": [
+            r"@anthropic-ai[/\\]claude-code",
+            r"(^|[/\\ ])claude(\.exe|\.js|\.cjs|\.mjs)?( |$)",
+        ],
+        "exclude_names": ["*antigravity*"],
+        # Claude desktop app (macOS bundle, Windows AnthropicClaude install)
+        "exclude_exe_globs": ["*/claude.app/*", "*/anthropicclaude/*"],
+        "exclude_cmdline": [r"antigravity[-_ ]?manager", r"ai[-_ ]tools[-_ ]manager"],
+        "exclude_self": "pid",
+        "platforms": {},
+    },
+}
+
+
+def _compile_globs(globs):
+    if not globs:
+        return None
+    return re.compile("|".join(fnmatch.translate(g.replace("\\", "/")) for g in globs), re.IGNORECASE)
+
+
+def _compile_patterns(patterns):
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+
+
+class MatchRule:
+    """Compiled process matching rule (see PROCESS_RULES for the keys)
+
+    Everything is compiled once; the name prefilter runs on every process of
+    a scan, exe and cmdline are only looked at (and therefore only read) for
+    processes that pass it. Paths are matched with forward slashes on every
+    platform.
+    """
+
+    def __init__(self, prefilter, names=(), exe_globs=(), cmdline_patterns=(),
+                 exclude_names=(), exclude_exe_globs=(), exclude_cmdline=(), exclude_self=True):
+        self.prefilter = re.compile(prefilter, re.IGNORECASE)
+        self.names = frozenset(n.lower() for n in names)
+        self.exe_re = _compile_globs(exe_globs)
+        self.cmdline_re = _compile_patterns(cmdline_patterns)
+        self.exclude_names_re = _compile_globs(exclude_names)
+        self.exclude_exe_re = _compile_globs(exclude_exe_globs)
+        self.exclude_cmdline_re = _compile_patterns(exclude_cmdline)
+        self.own_pid = None
+        self.own_dir = None
+        if exclude_self:
+            self.own_pid = os.getpid()
+        if exclude_self is True:
+            # In PyInstaller builds sys.executable is the manager's exe, in dev the
+            # interpreter; processes started from that directory are never targets
+            self.own_dir = os.path.dirname(os.path.abspath(sys.executable)).replace("\\", "/").lower() + "/"
+
+    @classmethod
+    def from_spec(cls, spec):
+        return cls(
+            spec.get("prefilter") or ".",
+            names=spec.get("names") or (),
+            exe_globs=spec.get("exe_globs") or (),
+            cmdline_patterns=spec.get("cmdline_patterns") or (),
+            exclude_names=spec.get("exclude_names") or (),
+            exclude_exe_globs=spec.get("exclude_exe_globs") or (),
+            exclude_cmdline=spec.get("exclude_cmdline") or (),
+            exclude_self=spec.get("exclude_self", True),
+        )
+
+    def __call__(self, proc):
+        name = proc.info["name"] or ""
+        if not self.prefilter.search(name):
+            return False
+        if proc.pid == self.own_pid:
+            return False
+        if self.exclude_names_re and self.exclude_names_re.match(name):
+            return False
+
+        exe_path = None
+        matched = name.lower() in self.names
+        if not matched and self.exe_re:
+            exe_path = (proc.info.get("exe") or "").replace("\\", "/")
+            matched = bool(exe_path and self.exe_re.match(exe_path))
+
+        cmdline_str = None
+        if not matched and self.cmdline_re:
+            cmdline_str = " ".join(proc.info.get("cmdline") or [])
+            matched = bool(self.cmdline_re.search(cmdline_str))
+        if not matched:
+            return False
+
+        if self.exclude_exe_re or self.own_dir:
+            if exe_path is None:
+                exe_path = (proc.info.get("exe") or "").replace("\\", "/")
+            if exe_path:
+                if self.exclude_exe_re and self.exclude_exe_re.match(exe_path):
+                    return False
+                if self.own_dir and exe_path.lower().startswith(self.own_dir):
+                    return False
+
+        if self.exclude_cmdline_re:
+            if cmdline_str is None:
+                cmdline_str = " ".join(proc.info.get("cmdline") or [])
+            if self.exclude_cmdline_re.search(cmdline_str):
+                return False
+        return True
+
+
+def _resolve_rule_spec(app, system, overrides):
+    """Default rule of app for system with settings.json overrides applied"""
+    spec = {k: v for k, v in PROCESS_RULES[app].items() if k != "platforms"}
+    spec.update(PROCESS_RULES[app].get("platforms", {}).get(system, {}))
+    user = overrides.get(app) or {}
+    spec.update({k: v for k, v in user.items() if k != "platforms"})
+    spec.update((user.get("platforms") or {}).get(system, {}))
+    return spec
+
+
+_compiled_rules = {}
+
+
+def get_process_rule(app, system=None):
+    """Get the compiled MatchRule of app ("antigravity" or "claude")"""
+    system = system or platform.system()
+    rule = _compiled_rules.get((app, system))
+    if rule is None:
+        overrides = load_settings().get("process_rules") or {}
+        try:
+            rule = MatchRule.from_spec(_resolve_rule_spec(app, system, overrides))
+        except re.error as e:
+            warning(f"Invalid process_rules for {app} in settings ({e}), using defaults")
+            rule = MatchRule.from_spec(_resolve_rule_spec(app, system, {}))
+        _compiled_rules[(app, system)] = rule
+    return rule
+
+
+def reload_process_rules():
+    """Recompile rules after process_rules in settings.json changed"""
+    _compiled_rules.clear()
+    _antigravity_tracker.reset()
+    _claude_tracker.reset()
+
+
+def _is_antigravity_process(proc, system=None):
+    """Matcher: Antigravity main/helper process"""
+    return get_process_rule("antigravity", system)(proc)
+
+
+def _is_claude_process(proc):
+    """Matcher: Claude Code CLI process"""
+    return get_process_rule("claude")(proc)
+
+
+_antigravity_tracker = PidTracker(_is_antigravity_process)
+_claude_tracker = PidTracker(_is_claude_process)
+
+
+def is_process_running(process_name=None, fresh=False):
     """Check if Antigravity process is running
 
     Use cross-platform detection method:
     - macOS: Check if path contains Antigravity.app
     - Windows: Check if process name or path contains antigravity
     - Linux: Check if process name or path contains antigravity
+
+    Args:
+        fresh: Don't trust a cached process table snapshot (pinned PIDs are
+               still probed directly)
     """
-    system = platform.system()
+    return _antigravity_tracker.is_running(max_age=0 if fresh else None)
+
+
+def _record_exit_time(stage, seconds):
+    """Feed an observed exit time into the stage's moving average"""
+    previous = _exit_time_stats.get(stage)
+    _exit_time_stats[stage] = seconds if previous is None else (1 - EXIT_TIME_ALPHA) * previous + EXIT_TIME_ALPHA * seconds
+
+
+def _adaptive_timeout(stage, default, maximum):
+    """Timeout for a stage: a few times its usual exit time, within [MIN_STAGE_TIMEOUT, maximum]"""
+    observed = _exit_time_stats.get(stage)
+    if observed is None:
+        return min(default, maximum)
+    return max(MIN_STAGE_TIMEOUT, min(maximum, observed * 3))
+
 
-    for proc in psutil.process_iter(["name", "exe"]):
+def _wait_pidfd(procs, timeout, callback=None):
+    """Linux: block on pidfds until every process exits or timeout, returns (gone, alive)"""
+    gone = []
+    fds = {}
+    poller = select.poll()
+    try:
+        for proc in procs:
+            try:
+                fd = os.pidfd_open(proc.pid)
+            except ProcessLookupError:
+                gone.append(proc)
+                continue
+            # The pidfd refers to whatever has this PID now, make sure it's still ours
+            if not proc.is_running():
+                os.close(fd)
+                gone.append(proc)
+                continue
+            fds[fd] = proc
+            poller.register(fd, select.POLLIN)
+
+        for proc in gone:
+            if callback:
+                callback(proc)
+
+        deadline = time.monotonic() + timeout
+        while fds:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            for fd, _event in poller.poll(remaining * 1000):
+                proc = fds.pop(fd, None)
+                if proc is None:
+                    continue
+                poller.unregister(fd)
+                os.close(fd)
+                gone.append(proc)
+                if callback:
+                    callback(proc)
+        return gone, list(fds.values())
+    finally:
+        for fd in fds:
+            os.close(fd)
+
+
+def wait_for_exit(procs, timeout, callback=None):
+    """Wait until processes exit, returning as soon as the last one is gone
+
+    Uses pidfd + poll on Linux and psutil.wait_procs elsewhere.
+
+    Returns:
+        (gone, alive) lists of processes
+    """
+    if not procs:
+        return [], []
+    if platform.system() == "Linux" and hasattr(os, "pidfd_open"):
         try:
-            process_name_lower = proc.info["name"].lower() if proc.info["name"] else ""
-            exe_path = proc.info.get("exe", "").lower() if proc.info.get("exe") else ""
-
-            # Cross-platform detection
-            is_antigravity = False
-
-            if system == "Darwin":
-                # macOS: Check if path contains Antigravity.app
-                is_antigravity = "antigravity.app" in exe_path
-            elif system == "Windows":
-                # Windows: Check if process name or path contains antigravity
-                is_antigravity = (
-                    process_name_lower in ["antigravity.exe", "antigravity"]
-                    or "antigravity" in exe_path
-                )
+            return _wait_pidfd(procs, timeout, callback)
+        except OSError as e:
+            debug(f"pidfd wait unavailable ({e}), using psutil.wait_procs")
+    return psutil.wait_procs(procs, timeout=timeout, callback=callback)
+
+
+def _wait_stage(stage, procs, default, maximum, on_exit=None):
+    """Wait for one close stage with an adaptive timeout, returns processes still alive"""
+    stage_timeout = _adaptive_timeout(stage, default, maximum)
+    start = time.monotonic()
+
+    def callback(proc):
+        debug(f"Process exited: {proc.pid} after {time.monotonic() - start:.2f}s")
+        if on_exit:
+            on_exit(proc)
+
+    gone, alive = wait_for_exit(procs, stage_timeout, callback=callback)
+    # A timed-out stage counts as taking the full window, so the next wait grows
+    _record_exit_time(stage, time.monotonic() - start if not alive else stage_timeout)
+    return alive
+
+
+def _build_subtrees(procs):
+    """Group target processes into subtrees, root first then descendants (BFS)
+
+    Only parent links between targets count; a target whose parent is not a
+    target (e.g. launched by the desktop) is a root.
+    """
+    by_pid = {proc.pid: proc for proc in procs}
+    children = {}
+    roots = []
+    for proc in procs:
+        ppid = proc.info.get("ppid")
+        if ppid in by_pid and ppid != proc.pid:
+            children.setdefault(ppid, []).append(proc)
+        else:
+            roots.append(proc)
+
+    subtrees = []
+    for root in roots:
+        tree = [root]
+        for proc in tree:
+            tree.extend(children.get(proc.pid, []))
+        subtrees.append(tree)
+    return subtrees
+
+
+def _send_signal(proc, kill=False):
+    try:
+        if proc.is_running():
+            if kill:
+                proc.kill()
             else:
-                # Linux: Check if process name or path contains antigravity
-                is_antigravity = (
-                    process_name_lower == "antigravity" or "antigravity" in exe_path
-                )
+                proc.terminate()
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        pass
+    except Exception:
+        pass
 
-            if is_antigravity:
-                return True
 
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            pass
+def terminate_process_tree(procs, timeout, force_kill=True, stage_prefix=""):
+    """Terminate processes root-first and escalate per subtree
+
+    1. SIGTERM the roots only, so parents (e.g. Electron main) shut their
+       children down instead of respawning them; wait on everything at once.
+       As soon as a root exits, its leftover children get SIGTERM too.
+    2. Subtrees whose root ignored SIGTERM: SIGKILL root first, then children.
+    3. SIGKILL whatever is still alive.
+
+    Returns:
+        list of processes still running
+    """
+    subtrees = _build_subtrees(procs)
+    info(f"Sending termination signal (SIGTERM) to {len(subtrees)} process tree(s)...")
+    for tree in subtrees:
+        _send_signal(tree[0])
+
+    trees_by_root = {tree[0].pid: tree for tree in subtrees}
+
+    def on_exit(proc):
+        tree = trees_by_root.get(proc.pid)
+        if tree and len(tree) > 1:
+            debug(f"Root {proc.pid} exited, terminating its leftover children")
+            for child in tree[1:]:
+                _send_signal(child)
+
+    alive = set(_wait_stage(f"{stage_prefix}terminate", procs, timeout, timeout, on_exit=on_exit))
+    if not alive or not force_kill:
+        return list(alive)
+
+    # Escalate per subtree, hung roots first
+    stragglers = []
+    for tree in subtrees:
+        survivors = [proc for proc in tree if proc in alive]
+        if not survivors:
+            continue
+        if tree[0] in alive:
+            warning(f"Process {tree[0].info.get('name')}({tree[0].pid}) ignored SIGTERM, force killing its tree (SIGKILL)...")
+        for proc in survivors:
+            _send_signal(proc, kill=True)
+        stragglers.extend(survivors)
+
+    return _wait_stage(f"{stage_prefix}kill", stragglers, KILL_WAIT_TIMEOUT, KILL_WAIT_TIMEOUT)
+
+
+def _find_antigravity_targets(system):
+    """Fresh scan for Antigravity processes to close (the rule excludes the manager itself)"""
+    target_processes = _process_table.find(lambda proc: _is_antigravity_process(proc, system), max_age=0)
+    for proc in target_processes:
+        info(
+            f"Found target process: {proc.info['name']} ({proc.pid}) - {proc.info.get('exe', '')}"
+        )
+    return target_processes
+
+
+def _graceful_quit_request(system):
+    """Ask Antigravity to quit through the platform, returns True if the request was sent"""
+    if system == "Darwin":
+        # macOS: Use AppleScript
+        info("Attempting graceful exit via AppleScript...")
+        try:
+            result = subprocess.run(
+                ["osascript", "-e", 'tell application "Antigravity" to quit'],
+                capture_output=True,
+                timeout=3,
+            )
+            return result.returncode == 0
+        except Exception as e:
+            warning(f"AppleScript exit failed: {e}, trying other methods")
+
+    elif system == "Windows":
+        # Windows: Use taskkill graceful termination (without /F)
+        info("Attempting graceful exit via taskkill...")
+        try:
+            # CREATE_NO_WINDOW = 0x08000000
+            result = subprocess.run(
+                ["taskkill", "/IM", "Antigravity.exe", "/T"],
+                capture_output=True,
+                timeout=3,
+                creationflags=0x08000000,
+            )
+            return result.returncode == 0
+        except Exception as e:
+            warning(f"taskkill exit failed: {e}, trying other methods")
+
+    # Linux doesn't need special handling, use SIGTERM directly
     return False
 
 
+def _get_intentional_stop_file():
+    return get_app_data_dir() / "intentional_stop"
+
+
+def get_intentional_stop_time():
+    """When the manager last closed Antigravity on purpose (epoch seconds), None if never
+
+    Lets the supervisor tell a requested stop (switch, Stop button) from a crash.
+    """
+    try:
+        return _get_intentional_stop_file().stat().st_mtime
+    except OSError:
+        return None
+
+
+def _mark_intentional_stop():
+    try:
+        _get_intentional_stop_file().touch()
+    except OSError:
+        pass
+
+
+@traced("close", source="antigravity")
 def close_antigravity(timeout=10, force_kill=True):
     """Gracefully close all Antigravity processes
 
@@ -59,8 +638,12 @@ def close_antigravity(timeout=10, force_kill=True):
        - macOS: AppleScript
        - Windows: taskkill /IM (graceful termination)
        - Linux: SIGTERM
-    2. Gentle termination (SIGTERM/TerminateProcess) - Give process chance to cleanup
-    3. Force kill (SIGKILL/taskkill /F) - Last resort
+    2. Gentle termination (SIGTERM/TerminateProcess) - Sent to process tree roots first,
+       leftover children follow once their root has exited
+    3. Force kill (SIGKILL/taskkill /F) - Last resort, per subtree whose root hangs
+
+    Each stage returns as soon as the last target exits; its timeout adapts to
+    the exit times observed in previous runs (capped by `timeout`).
     """
     info("Attempting to close Antigravity...")
     system = platform.system()
@@ -70,182 +653,38 @@ def close_antigravity(timeout=10, force_kill=True):
         warning(f"Unknown platform: {system}, trying generic method")
 
     try:
-        # Stage 1: Platform specific graceful exit
-        if system == "Darwin":
-            # macOS: Use AppleScript
-            info("Attempting graceful exit via AppleScript...")
-            try:
-                result = subprocess.run(
-                    ["osascript", "-e", 'tell application "Antigravity" to quit'],
-                    capture_output=True,
-                    timeout=3,
-                )
-                if result.returncode == 0:
-                    info("Exit request sent, waiting for app response...")
-                    time.sleep(2)
-            except Exception as e:
-                warning(f"AppleScript exit failed: {e}, trying other methods")
-
-        elif system == "Windows":
-            # Windows: Use taskkill graceful termination (without /F)
-            info("Attempting graceful exit via taskkill...")
-            try:
-                # CREATE_NO_WINDOW = 0x08000000
-                startupinfo = subprocess.STARTUPINFO()
-                startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-
-                result = subprocess.run(
-                    ["taskkill", "/IM", "Antigravity.exe", "/T"],
-                    capture_output=True,
-                    timeout=3,
-                    creationflags=0x08000000,
-                )
-                if result.returncode == 0:
-                    info("Exit request sent, waiting for app response...")
-                    time.sleep(2)
-            except Exception as e:
-                warning(f"taskkill exit failed: {e}, trying other methods")
-
-        # Linux doesn't need special handling, use SIGTERM directly
-
-        # Check and collect still running processes
-        target_processes = []
-        for proc in psutil.process_iter(["pid", "name", "exe"]):
-            try:
-                process_name_lower = (
-                    proc.info["name"].lower() if proc.info["name"] else ""
-                )
-                exe_path = (
-                    proc.info.get("exe", "").lower() if proc.info.get("exe") else ""
-                )
-
-                # Exclude self process
-                if proc.pid == os.getpid():
-                    continue
-
-                # Exclude all processes in current app directory (prevent killing self and subprocesses)
-                # In PyInstaller environment, sys.executable points to exe file
-                # In dev environment, it points to python.exe
-                try:
-                    import sys
-
-                    current_exe = sys.executable
-                    current_dir = os.path.dirname(os.path.abspath(current_exe)).lower()
-                    if exe_path and current_dir in exe_path:
-                        # print(f"DEBUG: Skipping process in current dir: {proc.info['name']}")
-                        continue
-                except:
-                    pass
-
-                # Cross-platform detection: Check process name or executable path
-                is_antigravity = False
-
-                if system == "Darwin":
-                    # macOS: Check if path contains Antigravity.app
-                    is_antigravity = "antigravity.app" in exe_path
-                elif system == "Windows":
-                    # Windows: Strictly match process name antigravity.exe
-                    # Or path contains antigravity and process name is not AI Tools Manager.exe
-                    is_target_name = process_name_lower in [
-                        "antigravity.exe",
-                        "antigravity",
-                    ]
-                    is_in_path = "antigravity" in exe_path
-                    is_manager = "manager" in process_name_lower
-
-                    is_antigravity = is_target_name or (is_in_path and not is_manager)
-                else:
-                    # Linux: Check if process name or path contains antigravity
-                    is_antigravity = (
-                        process_name_lower == "antigravity" or "antigravity" in exe_path
-                    )
-
-                if is_antigravity:
-                    info(
-                        f"Found target process: {proc.info['name']} ({proc.pid}) - {exe_path}"
-                    )
-                    target_processes.append(proc)
-
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
-
+        target_processes = _find_antigravity_targets(system)
         if not target_processes:
             info("All Antigravity processes closed normally")
             return True
+        _mark_intentional_stop()
 
-        info(f"Detected {len(target_processes)} processes still running")
-
-        # Stage 2: Gently request process termination (SIGTERM)
-        info("Sending termination signal (SIGTERM)...")
-        for proc in target_processes:
-            try:
-                if proc.is_running():
-                    proc.terminate()
-            except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
-                continue
-            except Exception as e:
-                continue
-
-        # Waiting for process natural termination
-        info(f"Waiting for process exit (max {timeout}s)...")
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            still_running = []
-            for proc in target_processes:
-                try:
-                    if proc.is_running():
-                        still_running.append(proc)
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-
-            if not still_running:
+        # Stage 1: Platform specific graceful exit
+        if _graceful_quit_request(system):
+            info("Exit request sent, waiting for app response...")
+            target_processes = _wait_stage("graceful", target_processes, GRACEFUL_EXIT_TIMEOUT, timeout)
+            if not target_processes:
                 info("All Antigravity processes closed normally")
                 return True
 
-            time.sleep(0.5)
-
-        # Stage 3: Force kill stubborn processes (SIGKILL)
-        if still_running:
-            still_running_names = ", ".join(
-                [f"{p.info['name']}({p.pid})" for p in still_running]
-            )
-            warning(
-                f"Still have {len(still_running)} processes running: {still_running_names}"
-            )
-
-            if force_kill:
-                info("Sending force kill signal (SIGKILL)...")
-                for proc in still_running:
-                    try:
-                        if proc.is_running():
-                            proc.kill()
-                    except (psutil.NoSuchProcess, psutil.AccessDenied):
-                        continue
-
-                # Final check
-                time.sleep(1)
-                final_check = []
-                for proc in still_running:
-                    try:
-                        if proc.is_running():
-                            final_check.append(proc)
-                    except (psutil.NoSuchProcess, psutil.AccessDenied):
-                        continue
+        info(f"Detected {len(target_processes)} processes still running")
 
-                if not final_check:
-                    info("All Antigravity processes have been terminated")
-                    return True
-                else:
-                    final_list = ", ".join(
-                        [f"{p.info['name']}({p.pid})" for p in final_check]
-                    )
-                    error(f"Processes unable to terminate: {final_list}")
-                    return False
-            else:
-                error("Some processes failed to close, please close manually and retry")
-                return False
+        # Stage 2 + 3: Tree-aware termination (SIGTERM roots, escalate per subtree)
+        info(f"Waiting for process exit (max {timeout}s)...")
+        final_check = terminate_process_tree(target_processes, timeout, force_kill=force_kill)
+        if not final_check:
+            info("All Antigravity processes have been terminated")
+            return True
 
-        return True
+        final_list = ", ".join(
+            [f"{p.info['name']}({p.pid})" for p in final_check]
+        )
+        if force_kill:
+            error(f"Processes unable to terminate: {final_list}")
+        else:
+            warning(f"Still have {len(final_check)} processes running: {final_list}")
+            error("Some processes failed to close, please close manually and retry")
+        return False
 
     except Exception as e:
         error(f"Error closing Antigravity process: {str(e)}")
@@ -254,72 +693,27 @@ def close_antigravity(timeout=10, force_kill=True):
 
 def is_claude_running():
     """Check if Claude Code process is running"""
-    for proc in psutil.process_iter(["name", "cmdline"]):
-        try:
-            name = proc.info["name"].lower() if proc.info["name"] else ""
-            cmdline = proc.info.get("cmdline", [])
-            cmdline_str = " ".join(cmdline).lower() if cmdline else ""
-
-            # Look for claude in name or command line
-            # Exclude the manager itself
-            if ("claude" in name or "claude" in cmdline_str) and "antigravity" not in name and "manager" not in cmdline_str:
-                return True
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            pass
-    return False
+    return _claude_tracker.is_running()
 
 
+@traced("close", source="claude")
 def close_claude(timeout=10):
     """Gracefully close Claude Code processes"""
     info("Attempting to close Claude Code...")
     
-    target_processes = []
-    for proc in psutil.process_iter(["pid", "name", "cmdline"]):
-        try:
-            name = proc.info["name"].lower() if proc.info["name"] else ""
-            cmdline = proc.info.get("cmdline", [])
-            cmdline_str = " ".join(cmdline).lower() if cmdline else ""
-
-            if ("claude" in name or "claude" in cmdline_str) and "antigravity" not in name and "manager" not in cmdline_str:
-                target_processes.append(proc)
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            continue
+    target_processes = _process_table.find(_is_claude_process, max_age=0)
 
     if not target_processes:
         info("No Claude Code processes found")
         return True
 
-    # Send SIGTERM
-    for proc in target_processes:
-        try:
-            proc.terminate()
-        except:
-            pass
-
-    # Wait for exit
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        still_running = False
-        for proc in target_processes:
-            if proc.is_running():
-                still_running = True
-                break
-        if not still_running:
-            info("Claude Code processes closed")
-            return True
-        time.sleep(0.5)
-
-    # Force kill if needed
-    for proc in target_processes:
-        try:
-            if proc.is_running():
-                proc.kill()
-        except:
-            pass
-            
+    still_running = terminate_process_tree(target_processes, timeout, force_kill=True, stage_prefix="claude_")
+    if not still_running:
+        info("Claude Code processes closed")
     return True
 
 
+@traced("start", source="antigravity")
 def start_antigravity(use_uri=True):
     """Start Antigravity
 
@@ -368,3 +762,198 @@ def start_antigravity(use_uri=True):
             warning("URI start failed, trying executable path...")
             return start_antigravity(use_uri=False)
         return False
+
+
+def _readiness_signal(procs, db_paths):
+    """Check an Antigravity process tree for signs the app is usable, None if not yet"""
+    for proc in procs:
+        cmdline = proc.info.get("cmdline") or []
+        if any(arg == "--type=renderer" for arg in cmdline):
+            return "window renderer started"
+
+    for proc in procs:
+        try:
+            for opened in proc.open_files():
+                if opened.path in db_paths:
+                    return "state.vscdb opened"
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return None
+
+
+def wait_ready(timeout=30):
+    """Wait until Antigravity is actually up (call right after start_antigravity)
+
+    Detects the main process first, then a readiness signal: a window
+    renderer process appearing or the app opening its state.vscdb.
+
+    Returns:
+        float: Seconds until ready, or None on timeout
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    db_paths = {str(path) for path in get_antigravity_db_paths()}
+    main_pid = None
+
+    while time.monotonic() < deadline:
+        procs = _process_table.find(_is_antigravity_process, max_age=READY_POLL_INTERVAL)
+        if procs:
+            if main_pid is None:
+                pids = {proc.pid for proc in procs}
+                main = next((p for p in procs if p.info.get("ppid") not in pids), procs[0])
+                main_pid = main.pid
+                info(f"Antigravity main process detected: {main_pid} ({time.monotonic() - start:.1f}s)")
+
+            signal = _readiness_signal(procs, db_paths)
+            if signal:
+                elapsed = time.monotonic() - start
+                _antigravity_tracker.track(procs)
+                info(f"Antigravity ready in {elapsed:.1f}s ({signal})")
+                return elapsed
+
+        time.sleep(READY_POLL_INTERVAL)
+
+    if main_pid is None:
+        warning(f"Antigravity process not found within {timeout}s")
+    else:
+        warning(f"Antigravity started but not ready within {timeout}s")
+    return None
+
+
+ResourceSample = namedtuple("ResourceSample", ["timestamp", "cpu_percent", "rss", "threads", "process_count", "sessions"])
+
+
+class ResourceSampler:
+    """CPU / memory / thread usage of the Antigravity and Claude process trees
+
+    Matching reuses the shared process table scan; children of the matched
+    processes (language servers, MCP servers, shells) are found through the
+    same scan's parent map.
+    psutil.Process objects are kept between samples because cpu_percent()
+    measures against the previous call on the same object; the first sample
+    of a new process therefore reports 0% CPU.
+
+    Each sample also breaks usage down per session: the CLAUDE_CONFIG_DIR
+    profile for Claude (see claude_manager isolated mode), the process name
+    for Antigravity.
+    """
+
+    def __init__(self, history=RESOURCE_HISTORY):
+        self.matchers = {
+            "antigravity": _is_antigravity_process,
+            "claude": _is_claude_process,
+        }
+        self._procs = {app: {} for app in self.matchers}
+        self._labels = {}
+        self._history = {app: deque(maxlen=history) for app in self.matchers}
+        self._lock = threading.Lock()
+
+    def _tree(self, app):
+        """Matched processes plus their descendants, keyed by (pid, create_time)
+
+        Descendants come from one ppid -> children map of the shared scan,
+        walked from the matched roots only.
+        """
+        found = {proc.pid: proc for proc in _process_table.find(self.matchers[app])}
+        if found:
+            children = _process_table.children_map()
+            stack = list(found)
+            while stack:
+                for entry in children.get(stack.pop(), ()):
+                    if entry.pid in found:
+                        continue
+                    try:
+                        found[entry.pid] = to_process(entry)
+                    except (psutil.NoSuchProcess, psutil.AccessDenied):
+                        continue
+                    stack.append(entry.pid)
+        tree = {}
+        for pid, proc in found.items():
+            try:
+                tree[(pid, proc.create_time())] = proc
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return tree
+
+    def _session_label(self, app, key, proc):
+        label = self._labels.get(key)
+        if label is None:
+            if app == "claude":
+                try:
+                    config_dir = proc.environ().get("CLAUDE_CONFIG_DIR")
+                    label = os.path.basename(config_dir.rstrip("/\\")) if config_dir else "default"
+                except (psutil.NoSuchProcess, psutil.AccessDenied, OSError):
+                    label = "unknown"
+            else:
+                try:
+                    label = proc.name()
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    label = "unknown"
+            self._labels[key] = label
+        return label
+
+    def sample(self, app):
+        """Take one sample of app ("antigravity" or "claude"), returns a ResourceSample"""
+        with self._lock:
+            cached = self._procs[app]
+            current = {}
+            cpu = 0.0
+            rss = 0
+            threads = 0
+            sessions = {}
+
+            for key, proc in self._tree(app).items():
+                # Keep the previous object so cpu_percent has a baseline
+                proc = cached.get(key, proc)
+                try:
+                    with proc.oneshot():
+                        proc_cpu = proc.cpu_percent(None)
+                        proc_rss = proc.memory_info().rss
+                        proc_threads = proc.num_threads()
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    continue
+                current[key] = proc
+                cpu += proc_cpu
+                rss += proc_rss
+                threads += proc_threads
+
+                label = self._session_label(app, key, proc)
+                session = sessions.setdefault(label, {"cpu_percent": 0.0, "rss": 0, "process_count": 0})
+                session["cpu_percent"] += proc_cpu
+                session["rss"] += proc_rss
+                session["process_count"] += 1
+
+            for key in set(cached) - set(current):
+                self._labels.pop(key, None)
+            self._procs[app] = current
+
+            sample = ResourceSample(time.time(), cpu, rss, threads, len(current), sessions)
+            self._history[app].append(sample)
+            return sample
+
+    def latest(self, app):
+        """Most recent sample of app, None if never sampled"""
+        with self._lock:
+            history = self._history[app]
+            return history[-1] if history else None
+
+    def history(self, app):
+        """Samples of app, oldest first"""
+        with self._lock:
+            return list(self._history[app])
+
+
+_resource_sampler = ResourceSampler()
+
+
+def get_resource_sampler():
+    """Get the shared resource sampler"""
+    return _resource_sampler
+
+
+def format_bytes(size):
+    """Human readable size, e.g. 1.5 GB"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+import platform
+import signal
+import subprocess
+import threading
+import time
+from datetime import datetime
+
+import psutil
+
+# Use relative imports
+from utils import info, error, warning, debug, get_app_data_dir, load_settings
+from process_manager import get_intentional_stop_time, is_process_running, start_antigravity, wait_ready
+
+# Restart policies (seconds). "supervisor_policies" in settings.json can add or override presets.
+RESTART_POLICIES = {
+    "default": {
+        "check_interval": 5,
+        "initial_backoff": 5,
+        "backoff_multiplier": 2,
+        "max_backoff": 300,
+        "crash_loop_window": 600,   # Restarts are counted within this window...
+        "crash_loop_max": 5,        # ...and more than this many means a crash loop
+        "crash_loop_cooldown": 1800,
+        "stable_after": 120,        # Uptime after which the backoff resets
+        "ready_timeout": 60,
+    },
+    "aggressive": {
+        "check_interval": 2,
+        "initial_backoff": 1,
+        "backoff_multiplier": 2,
+        "max_backoff": 60,
+        "crash_loop_window": 300,
+        "crash_loop_max": 10,
+        "crash_loop_cooldown": 300,
+        "stable_after": 60,
+        "ready_timeout": 60,
+    },
+    "conservative": {
+        "check_interval": 15,
+        "initial_backoff": 30,
+        "backoff_multiplier": 2,
+        "max_backoff": 900,
+        "crash_loop_window": 1800,
+        "crash_loop_max": 3,
+        "crash_loop_cooldown": 3600,
+        "stable_after": 300,
+        "ready_timeout": 90,
+    },
+}
+
+
+def get_supervisor_state_path():
+    return get_app_data_dir() / "supervisor.json"
+
+
+def get_supervisor_pid_path():
+    return get_app_data_dir() / "supervisor.pid"
+
+
+def get_restart_policy(name="default"):
+    """Get a restart policy preset merged with settings.json overrides"""
+    overrides = load_settings().get("supervisor_policies", {})
+    policy = dict(RESTART_POLICIES["default"])
+    policy.update(RESTART_POLICIES.get(name, {}))
+    policy.update(overrides.get(name, {}))
+    return policy
+
+
+def _now_iso():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class Supervisor:
+    """Keep Antigravity running: restart it after crashes with backoff
+
+    A stop requested through process_manager (switching, the Stop button) is
+    not a crash and is left alone. Repeated crashes back off exponentially;
+    too many restarts within the crash-loop window pause restarts for a
+    cooldown period.
+    """
+
+    def __init__(self, policy_name="default"):
+        self.policy_name = policy_name
+        self.policy = get_restart_policy(policy_name)
+        self._stop = threading.Event()
+        self.state = {
+            "pid": os.getpid(),
+            "policy": policy_name,
+            "status": "starting",
+            "started_at": _now_iso(),
+            "app_running": False,
+            "app_up_since": None,
+            "total_uptime": 0.0,
+            "restart_count": 0,
+            "crash_count": 0,
+            "last_crash_at": None,
+            "last_restart_at": None,
+            "next_restart_at": None,
+        }
+        self._restart_times = []
+        self._consecutive_crashes = 0
+        self._up_since = None
+        self._last_seen_running = None
+        self._restart_due = None
+
+    def stop(self, *_):
+        self._stop.set()
+
+    def _save_state(self):
+        try:
+            with open(get_supervisor_state_path(), "w", encoding="utf-8") as f:
+                json.dump(self.state, f, indent=2)
+        except Exception as e:
+            warning(f"Failed to save supervisor state: {e}")
+
+    def _set_status(self, status):
+        if self.state["status"] != status:
+            debug(f"Supervisor status: {self.state['status']} -> {status}")
+            self.state["status"] = status
+            self._save_state()
+
+    def _backoff(self):
+        policy = self.policy
+        delay = policy["initial_backoff"] * policy["backoff_multiplier"] ** max(0, self._consecutive_crashes - 1)
+        return min(delay, policy["max_backoff"])
+
+    def _on_app_up(self, now):
+        if self._up_since is None:
+            self._up_since = now
+            self.state["app_up_since"] = _now_iso()
+            self.state["app_running"] = True
+            self._restart_due = None
+            self.state["next_restart_at"] = None
+            self._set_status("watching")
+            self._save_state()
+        elif self._consecutive_crashes and now - self._up_since > self.policy["stable_after"]:
+            debug("App stable, resetting restart backoff")
+            self._consecutive_crashes = 0
+        self._last_seen_running = time.time()
+
+    def _on_app_down(self, now):
+        if self._up_since is not None:
+            self.state["total_uptime"] += now - self._up_since
+            self._up_since = None
+            self.state["app_running"] = False
+            self.state["app_up_since"] = None
+
+            stopped_at = get_intentional_stop_time()
+            if stopped_at and self._last_seen_running and stopped_at >= self._last_seen_running - self.policy["check_interval"]:
+                info("Antigravity was stopped by the manager, not restarting")
+                self._set_status("app stopped")
+                return
+
+            self._consecutive_crashes += 1
+            self.state["crash_count"] += 1
+            self.state["last_crash_at"] = _now_iso()
+            delay = self._backoff()
+            self._restart_due = now + delay
+            self.state["next_restart_at"] = datetime.fromtimestamp(time.time() + delay).isoformat(timespec="seconds")
+            warning(f"Antigravity exited unexpectedly, restarting in {delay:.0f}s")
+            self._set_status("restart pending")
+            self._save_state()
+
+        if self._restart_due is None:
+            if self.state["status"] not in ("app stopped", "waiting for app"):
+                self._set_status("waiting for app")
+        elif now >= self._restart_due:
+            self._restart(now)
+
+    def _restart(self, now):
+        policy = self.policy
+        window_start = now - policy["crash_loop_window"]
+        self._restart_times = [t for t in self._restart_times if t >= window_start]
+        if len(self._restart_times) >= policy["crash_loop_max"]:
+            cooldown = policy["crash_loop_cooldown"]
+            error(f"Antigravity is crash-looping ({len(self._restart_times)} restarts in "
+                  f"{policy['crash_loop_window']}s), pausing restarts for {cooldown}s")
+            self._restart_times.clear()
+            self._restart_due = now + cooldown
+            self.state["next_restart_at"] = datetime.fromtimestamp(time.time() + cooldown).isoformat(timespec="seconds")
+            self._set_status("crash loop cooldown")
+            self._save_state()
+            return
+
+        info("Supervisor restarting Antigravity...")
+        self._restart_times.append(now)
+        self.state["restart_count"] += 1
+        self.state["last_restart_at"] = _now_iso()
+        self._restart_due = None
+        if start_antigravity() and wait_ready(policy["ready_timeout"]) is not None:
+            self._on_app_up(time.monotonic())
+        else:
+            # Treat a failed start like another crash
+            self._consecutive_crashes += 1
+            self._restart_due = time.monotonic() + self._backoff()
+            self._set_status("restart pending")
+        self._save_state()
+
+    def run(self):
+        """Supervise until stop() or SIGTERM"""
+        try:
+            signal.signal(signal.SIGTERM, self.stop)
+        except ValueError:
+            # Not in main thread
+            pass
+
+        # The create time lets readers tell us apart from a later process reusing the PID
+        with open(get_supervisor_pid_path(), "w", encoding="utf-8") as f:
+            f.write(f"{os.getpid()} {psutil.Process().create_time()}")
+        info(f"Supervisor started (pid {os.getpid()}, policy {self.policy_name})")
+
+        try:
+            while not self._stop.is_set():
+                now = time.monotonic()
+                if is_process_running():
+                    self._on_app_up(now)
+                else:
+                    self._on_app_down(now)
+                self._stop.wait(self.policy["check_interval"])
+        finally:
+            if self._up_since is not None:
+                self.state["total_uptime"] += time.monotonic() - self._up_since
+            self.state["status"] = "stopped"
+            self._save_state()
+            try:
+                os.remove(get_supervisor_pid_path())
+            except OSError:
+                pass
+            info("Supervisor stopped")
+
+
+def get_supervisor_pid():
+    """PID of the running supervisor daemon, None if not running
+
+    The PID is only trusted if the process still has the create time recorded
+    in the pidfile, so a stale pidfile never points at an unrelated process.
+    """
+    try:
+        with open(get_supervisor_pid_path(), "r", encoding="utf-8") as f:
+            fields = f.read().split()
+        pid = int(fields[0])
+        create_time = float(fields[1]) if len(fields) > 1 else None
+    except (OSError, ValueError, IndexError):
+        return None
+    try:
+        proc = psutil.Process(pid)
+        if create_time is not None:
+            if abs(proc.create_time() - create_time) > 1:
+                return None
+        elif "supervise" not in proc.cmdline():
+            # Pidfile from an older version without the create time
+            return None
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        return None
+    return pid
+
+
+def start_daemon(launcher, policy_name="default"):
+    """Start the supervisor in the background
+
+    Args:
+        launcher: Command prefix that runs main.py (e.g. [sys.executable, "main.py"])
+    """
+    pid = get_supervisor_pid()
+    if pid:
+        warning(f"Supervisor already running (pid {pid})")
+        return False
+    if policy_name not in RESTART_POLICIES and policy_name not in load_settings().get("supervisor_policies", {}):
+        error(f"Unknown restart policy: {policy_name}")
+        return False
+
+    cmd = list(launcher) + ["supervise", "run", "--policy", policy_name]
+    kwargs = {"stdin": subprocess.DEVNULL, "stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+    if platform.system() == "Windows":
+        # DETACHED_PROCESS | CREATE_NEW_PROCESS_GROUP | CREATE_NO_WINDOW
+        kwargs["creationflags"] = 0x00000008 | 0x00000200 | 0x08000000
+    else:
+        kwargs["start_new_session"] = True
+    try:
+        proc = subprocess.Popen(cmd, **kwargs)
+    except Exception as e:
+        error(f"Failed to start supervisor: {e}")
+        return False
+    info(f"Supervisor started in background (pid {proc.pid}, policy {policy_name})")
+    return True
+
+
+def stop_daemon(timeout=10):
+    """Stop the background supervisor"""
+    pid = get_supervisor_pid()
+    if not pid:
+        info("Supervisor is not running")
+        return True
+    try:
+        proc = psutil.Process(pid)
+        proc.terminate()
+        proc.wait(timeout)
+    except psutil.NoSuchProcess:
+        pass
+    except psutil.TimeoutExpired:
+        error(f"Supervisor (pid {pid}) did not stop within {timeout}s")
+        return False
+    info("Supervisor stopped")
+    return True
+
+
+def get_supervisor_status():
+    """Get supervisor state (from its state file) plus whether it is alive"""
+    state = {}
+    try:
+        with open(get_supervisor_state_path(), "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        pass
+    pid = get_supervisor_pid()
+    state["alive"] = pid is not None
+    if not pid and state.get("status") not in (None, "stopped"):
+        state["status"] = "dead"
+    return state
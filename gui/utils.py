@@ -1,7 +1,18 @@
 # -*- coding: utf-8 -*-
+import atexit
+import functools
+import gzip
+import json
 import os
+import queue
 import sys
 import platform
+import shutil
+import threading
+import time
+import uuid
+from collections import namedtuple
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
 
@@ -9,6 +20,16 @@ from datetime import datetime
 # Log Tools
 # -------------------------------------------------------------------------
 
+# Background log writer tuning
+LOG_QUEUE_SIZE = 10000      # Lines buffered before new ones are dropped
+LOG_FLUSH_INTERVAL = 0.5    # Max seconds a line waits before being written
+LOG_BATCH_SIZE = 256        # Lines that trigger an immediate write
+
+# Log rotation: app.log is rolled into app-<timestamp>.log.gz segments
+LOG_MAX_BYTES = 5 * 1024 * 1024         # Size at which app.log is rotated
+LOG_MAX_SEGMENTS = 10                   # Compressed segments kept
+LOG_MAX_TOTAL_BYTES = 50 * 1024 * 1024  # Cap on all segments together
+
 def get_log_file_path():
     """Get log file path"""
     try:
@@ -17,48 +38,481 @@ def get_log_file_path():
     except:
         return None
 
-def _log_to_file(message):
-    """Write log to file"""
+def get_log_segments():
+    """Rotated log segments (compressed or pending compression), oldest first"""
     try:
-        log_file = get_log_file_path()
-        if log_file:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            with open(log_file, "a", encoding="utf-8") as f:
-                f.write(f"[{timestamp}] {message}\n")
+        log_dir = get_app_data_dir()
+    except:
+        return []
+    segments = [p for p in log_dir.glob("app-*.log*") if p.name.endswith((".log", ".log.gz"))]
+    # Timestamped names sort chronologically (compare without the extension so
+    # app-<stamp>.log sorts before app-<stamp>-1.log)
+    return sorted(segments, key=lambda p: p.name.split(".", 1)[0])
+
+def _compress_segment(path):
+    """gzip a rotated segment in place (path -> path.gz), returns bool"""
+    target = path.with_name(path.name + ".gz")
+    # Per-process temp name: another manager process may compress the same segment
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.gz.tmp")
+    try:
+        with open(path, "rb") as src, gzip.open(tmp, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.replace(tmp, target)
+        os.remove(path)
+        return True
+    except Exception:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return False
+
+def _prune_segments():
+    """Drop the oldest segments beyond the count and total size caps"""
+    segments = get_log_segments()
+    sizes = {}
+    for path in segments:
+        try:
+            sizes[path] = path.stat().st_size
+        except OSError:
+            sizes[path] = 0
+    total = sum(sizes.values())
+    while segments and (len(segments) > LOG_MAX_SEGMENTS or total > LOG_MAX_TOTAL_BYTES):
+        oldest = segments.pop(0)
+        total -= sizes[oldest]
+        try:
+            os.remove(oldest)
+        except OSError:
+            pass
+
+def _compress_pending_segments():
+    """Compress every uncompressed segment, then apply the caps"""
+    # Re-scan so segments rotated while compressing are picked up too; a
+    # segment that failed (e.g. disk full) is left for the next pass
+    failed = set()
+    while True:
+        pending = [p for p in get_log_segments() if p.suffix == ".log" and p not in failed]
+        if not pending:
+            break
+        for path in pending:
+            if not _compress_segment(path):
+                failed.add(path)
+    _prune_segments()
+
+class _LogFileLock:
+    """Inter-process lock around app.log writes and rotation
+
+    The GUI, CLI commands and the supervisor daemon all append to the same
+    app.log. Holding this lock while writing a batch and while rotating means
+    no process appends to a file another one has just moved aside.
+    """
+
+    def __init__(self):
+        self._file = None
+
+    def __enter__(self):
+        if self._file is None:
+            log_file = get_log_file_path()
+            self._file = open(log_file.with_name(log_file.name + ".lock"), "a+b")
+        if platform.system() == "Windows":
+            import msvcrt
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if platform.system() == "Windows":
+                import msvcrt
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        except OSError:
+            pass
+        return False
+
+    def close(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception:
+                pass
+            self._file = None
+
+class _AsyncLogWriter:
+    """Append log lines to app.log from a background thread
+
+    Logging threads (including the GUI thread) only format the line and put it
+    on a bounded queue; the writer thread batches lines and writes them through
+    a file handle kept open between batches. If the queue is full, lines are
+    dropped (and counted) rather than blocking the caller.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._file = None
+        self._file_lock = _LogFileLock()
+        self._size = 0
+        self._dropped = 0
+        self._compressor = None
+
+    def put(self, line):
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            self._dropped += 1
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = []
+            flushes = []
+            stop = False
+            try:
+                item = self._queue.get()
+            except Exception:
+                return
+            deadline = time.monotonic() + LOG_FLUSH_INTERVAL
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    flushes.append(item)
+                else:
+                    batch.append(item)
+                if stop or flushes or len(batch) >= LOG_BATCH_SIZE:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            # A flush or shutdown request also takes everything already queued
+            if flushes or stop:
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if isinstance(item, threading.Event):
+                        flushes.append(item)
+                    elif item is not None:
+                        batch.append(item)
+
+            self._write(batch)
+            for event in flushes:
+                event.set()
+            if stop:
+                self._close_file()
+                self._file_lock.close()
+                return
+
+    def _write(self, batch):
+        if self._dropped:
+            record = LogRecord(time.time(), "WARN", f"{self._dropped} log lines dropped (log queue full)", None, None, None, None)
+            batch.append(record_to_json(record) + "\n")
+            self._dropped = 0
+        if not batch:
+            return
+        try:
+            log_file = get_log_file_path()
+            if not log_file:
+                return
+            with self._file_lock:
+                # Another process may have rotated app.log since our last batch
+                if self._file is not None and not self._is_current(log_file):
+                    self._close_file()
+                if self._file is None:
+                    self._file = open(log_file, "a", encoding="utf-8")
+                    # Segments left uncompressed by an earlier run
+                    self._start_compressor()
+                data = "".join(batch)
+                self._file.write(data)
+                self._file.flush()
+                self._size = self._file.tell()
+                if self._size >= LOG_MAX_BYTES:
+                    self._rotate()
+        except Exception:
+            self._close_file()
+
+    def _is_current(self, log_file):
+        """Whether our open handle still refers to the file at log_file"""
+        try:
+            opened = os.fstat(self._file.fileno())
+            current = os.stat(log_file)
+        except OSError:
+            return False
+        return (opened.st_dev, opened.st_ino) == (current.st_dev, current.st_ino)
+
+    def _rotate(self):
+        """Move app.log aside as a timestamped segment and compress it in the background
+
+        Called with the log file lock held.
+        """
+        log_file = Path(self._file.name)
+        self._close_file()
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        segment = log_file.with_name(f"app-{stamp}.log")
+        counter = 1
+        while segment.exists() or segment.with_name(segment.name + ".gz").exists():
+            segment = log_file.with_name(f"app-{stamp}-{counter}.log")
+            counter += 1
+        try:
+            os.replace(log_file, segment)
+        except OSError:
+            # Could not rotate (e.g. file locked on Windows), keep appending
+            pass
+        self._start_compressor()
+
+    def _start_compressor(self):
+        # One compression pass at a time; a pass picks up every pending segment
+        if self._compressor is not None and self._compressor.is_alive():
+            return
+        self._compressor = threading.Thread(target=_compress_pending_segments, name="log-compress", daemon=True)
+        self._compressor.start()
+
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception:
+                pass
+            self._file = None
+
+    def flush(self, timeout=2.0):
+        """Block until everything logged so far is written"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        event = threading.Event()
+        try:
+            self._queue.put(event, timeout=timeout)
+        except queue.Full:
+            return
+        event.wait(timeout)
+
+    def close(self, timeout=2.0):
+        """Drain the queue and stop the writer (registered with atexit)"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+        if self._compressor is not None:
+            self._compressor.join(timeout)
+
+_log_writer = _AsyncLogWriter()
+atexit.register(_log_writer.close)
+
+def flush_logs(timeout=2.0):
+    """Wait until pending log lines are in app.log (e.g. before reading it)"""
+    _log_writer.flush(timeout)
+
+def _log_to_file(record):
+    """Queue a record for the background writer"""
+    try:
+        _log_writer.put(record_to_json(record) + "\n")
     except:
         pass
 
-def _print_with_color(color_code, symbol, message):
-    """Color print function, also writes to file"""
-    formatted_msg = f"{symbol} {message}"
-    # In no-console mode, sys.stdout might be None, direct print will error
-    if sys.stdout:
+# -------------------------------------------------------------------------
+# Structured log records
+# -------------------------------------------------------------------------
+
+# level -> (console symbol, ANSI color)
+LOG_LEVELS = {
+    "INFO": ("INFO", "32"),
+    "WARN": ("WARN", "33"),
+    "ERR": ("ERR ", "31"),
+    "DBUG": ("DBUG", "90"),
+}
+
+LOG_SOURCES = ("antigravity", "claude", "codex")
+
+LogRecord = namedtuple("LogRecord", ["timestamp", "level", "message", "source", "op", "op_id", "duration"])
+
+_log_context = threading.local()
+_log_subscribers = []
+_log_subscribers_lock = threading.Lock()
+
+def subscribe_logs(callback):
+    """Call callback(record) for every LogRecord, from the logging thread"""
+    with _log_subscribers_lock:
+        if callback not in _log_subscribers:
+            _log_subscribers.append(callback)
+
+def unsubscribe_logs(callback):
+    with _log_subscribers_lock:
+        if callback in _log_subscribers:
+            _log_subscribers.remove(callback)
+
+def record_to_json(record):
+    """One JSON line of app.log"""
+    data = {
+        "ts": datetime.fromtimestamp(record.timestamp).isoformat(timespec="milliseconds"),
+        "level": record.level,
+        "msg": record.message,
+    }
+    for key in ("source", "op", "op_id", "duration"):
+        value = getattr(record, key)
+        if value is not None:
+            data[key] = value
+    return json.dumps(data, ensure_ascii=False)
+
+def record_from_json(line):
+    """Parse an app.log line back into a LogRecord, None if it isn't one
+
+    Lines from older versions ("[2024-01-01 12:00:00] INFO message") are
+    understood as well.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith("{"):
+        try:
+            data = json.loads(line)
+            timestamp = datetime.fromisoformat(data["ts"]).timestamp()
+            return LogRecord(timestamp, data.get("level", "INFO"), data.get("msg", ""),
+                             data.get("source"), data.get("op"), data.get("op_id"), data.get("duration"))
+        except (ValueError, KeyError, TypeError):
+            return None
+    if line.startswith("[") and "] " in line:
+        stamp, _, rest = line[1:].partition("] ")
         try:
-            print(f"\033[{color_code}m{formatted_msg}\033[0m")
+            timestamp = datetime.strptime(stamp, "%Y-%m-%d %H:%M:%S").timestamp()
+        except ValueError:
+            return None
+        level, _, message = rest.partition(" ")
+        if level not in LOG_LEVELS:
+            level, message = "INFO", rest
+        return LogRecord(timestamp, level, message.strip(), None, None, None, None)
+    return None
+
+def _current_span():
+    stack = getattr(_log_context, "spans", None)
+    return stack[-1] if stack else None
+
+def _emit(level, message, source=None, op=None, op_id=None, duration=None, console=True):
+    span = _current_span()
+    if span:
+        source = source or span["source"]
+        op = op or span["op"]
+        op_id = op_id or span["op_id"]
+    record = LogRecord(time.time(), level, str(message), source, op, op_id, duration)
+
+    # Console: the real stdout, so redirections (LogsView) don't see it twice
+    stream = sys.__stdout__
+    if console and stream:
+        symbol, color = LOG_LEVELS[level]
+        try:
+            stream.write(f"\033[{color}m{symbol} {record.message}\033[0m\n")
+            stream.flush()
         except:
             pass
-    _log_to_file(formatted_msg)
 
-def info(message):
-    """Print INFO log (Green)"""
-    _print_with_color("32", "INFO", message)
+    _log_to_file(record)
 
-def warning(message):
-    """Print WARNING log (Yellow)"""
-    _print_with_color("33", "WARN", message)
+    with _log_subscribers_lock:
+        subscribers = list(_log_subscribers)
+    for callback in subscribers:
+        try:
+            callback(record)
+        except Exception:
+            pass
+    return record
 
-def error(message):
-    """Print ERROR log (Red)"""
-    _print_with_color("31", "ERR ", message)
+@contextmanager
+def log_span(op, source=None):
+    """Group the logs of one operation and record its duration
 
-def debug(message):
-    """Print DEBUG log (Grey)"""
-    # Only print if DEBUG env var is set
-    if os.environ.get("DEBUG"):
-        _print_with_color("90", "DBUG", message)
+    Every record logged inside the block carries op, op_id and the source app
+    (inherited from an enclosing span if not given). On exit a DBUG record
+    (ERR if the block raised) with the duration in seconds is emitted.
+    """
+    parent = _current_span()
+    span = {
+        "op": op,
+        "op_id": uuid.uuid4().hex[:8],
+        "source": source or (parent["source"] if parent else None),
+    }
+    stack = getattr(_log_context, "spans", None)
+    if stack is None:
+        stack = _log_context.spans = []
+    stack.append(span)
+    start = time.perf_counter()
+    try:
+        yield span
+    except BaseException as e:
+        duration = round(time.perf_counter() - start, 4)
+        _emit("ERR", f"{op} failed after {duration:.2f}s: {e}", duration=duration, console=False)
+        raise
     else:
-        # In packaged app, we also want to log debug info to file for troubleshooting
-        _log_to_file(f"DBUG {message}")
+        duration = round(time.perf_counter() - start, 4)
+        _emit("DBUG", f"{op} finished in {duration:.2f}s", duration=duration, console=bool(os.environ.get("DEBUG")))
+    finally:
+        stack.pop()
+
+def traced(op, source=None):
+    """Decorator form of log_span"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with log_span(op, source):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def info(message, source=None):
+    """Log INFO (Green)"""
+    _emit("INFO", message, source)
+
+def warning(message, source=None):
+    """Log WARNING (Yellow)"""
+    _emit("WARN", message, source)
+
+def error(message, source=None):
+    """Log ERROR (Red)"""
+    _emit("ERR", message, source)
+
+def debug(message, source=None):
+    """Log DEBUG (Grey)"""
+    # Always recorded (in packaged app, we also want debug info in the file for
+    # troubleshooting), only printed if DEBUG env var is set
+    _emit("DBUG", message, source, console=bool(os.environ.get("DEBUG")))
+
+Logger = namedtuple("Logger", ["info", "warning", "error", "debug"])
+
+def get_logger(source):
+    """info/warning/error/debug bound to a source app
+
+    Modules tied to one app log through one of these, e.g.
+    log = get_logger("claude"); log.info("...").
+    """
+    return Logger(
+        functools.partial(info, source=source),
+        functools.partial(warning, source=source),
+        functools.partial(error, source=source),
+        functools.partial(debug, source=source),
+    )
 
 # -------------------------------------------------------------------------
 # Path Tools
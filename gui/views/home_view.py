@@ -2,16 +2,27 @@ import flet as ft
 import threading
 import time
 from datetime import datetime
-from process_manager import is_process_running, start_antigravity, close_antigravity, is_claude_running, close_claude
+from process_manager import is_process_running, start_antigravity, close_antigravity, is_claude_running, close_claude, get_resource_sampler, format_bytes
 from account_manager import add_account_snapshot as add_ag_snapshot, list_accounts_data as list_ag_data, switch_account as switch_ag, delete_account as delete_ag
 from claude_manager import add_account_snapshot as add_cc_snapshot, list_accounts_data as list_cc_data, switch_account as switch_cc, delete_account as delete_cc
+from claude_manager import get_switch_mode as get_cc_switch_mode, SWITCH_MODE_ISOLATED
 from db_manager import get_current_account_info
+from claude_watcher import ClaudeConfigWatcher
 from theme import get_palette
 from icons import AppIcons
 
 RADIUS_CARD = 12
 PADDING_PAGE = 20
 
+# Account list virtualization: cards have a fixed height so the visible rows
+# follow from the scroll offset, and only those (plus overscan) are built.
+ROW_HEIGHT = 84
+ROW_GAP = 12
+ROW_EXTENT = ROW_HEIGHT + ROW_GAP
+ROW_OVERSCAN = 4
+# Used until the first scroll event reports the real viewport
+DEFAULT_VIEWPORT_HEIGHT = 1000
+
 class HomeView(ft.Container):
     def __init__(self, page: ft.Page, app_state):
         super().__init__()
@@ -27,12 +38,26 @@ class HomeView(ft.Container):
         self.build_ui()
         
         # Accounts list
-        self.accounts_list = ft.Column(spacing=12, scroll=ft.ScrollMode.HIDDEN)
+        self.accounts_list = self.create_accounts_list()
         self.current_email = None
+        # Model of all accounts: [(account, is_current)]; cards exist only for the window
+        self.account_rows = []
+        # Cards in the window by id: (signature, control), reused while the signature holds
+        self.card_cache = {}
+        # Cards scrolled out of the window, waiting to be rebound
+        self.card_pool = []
+        self.window_range = (0, 0)
+        self.scroll_offset = 0.0
+        self.viewport_height = DEFAULT_VIEWPORT_HEIGHT
+        self.top_spacer = ft.Container(height=0)
+        self.bottom_spacer = ft.Container(height=0)
         
         # Start status monitoring
         self.running = True
 
+        # Captures new `claude login` sessions without a manual import
+        self.claude_watcher = ClaudeConfigWatcher(on_account_change=self.on_claude_account_change)
+
     def did_mount(self):
         self.running = True
         self.rebuild_content() # Initial build
@@ -42,6 +67,7 @@ class HomeView(ft.Container):
         
         # Automatically backup current account
         self.auto_backup()
+        self.claude_watcher.start()
 
     def auto_backup(self):
         def task():
@@ -51,22 +77,34 @@ class HomeView(ft.Container):
                 if add_ag_snapshot():
                     self.refresh_data()
             elif self.app_state.selected_app == "claude":
-                if add_cc_snapshot():
+                # Isolated profiles are owned by Claude itself, the shared login isn't
+                # the current account there
+                if get_cc_switch_mode() == SWITCH_MODE_ISOLATED:
+                    return
+                # Later logins are picked up by the config watcher
+                if add_cc_snapshot(only_if_changed=True):
                     self.refresh_data()
         threading.Thread(target=task, daemon=True).start()
 
+    def on_claude_account_change(self, email):
+        if self.app_state.selected_app == "claude" and self.page:
+            self.refresh_data()
+
     def will_unmount(self):
         self.running = False
+        self.claude_watcher.stop()
 
     def update_theme(self):
         self.palette = get_palette(self.main_page)
         self.bgcolor = self.palette.bg_page
+        self.reset_account_window()
         self.rebuild_content()
         self.refresh_data()
         if self.page:
             self.update()
 
     def update_locale(self):
+        self.reset_account_window()
         self.rebuild_content()
         self.refresh_data()
         if self.page:
@@ -146,7 +184,7 @@ class HomeView(ft.Container):
             )
             
             if not hasattr(self, 'accounts_list'):
-                self.accounts_list = ft.Column(spacing=12, scroll=ft.ScrollMode.HIDDEN)
+                self.accounts_list = self.create_accounts_list()
 
             dashboard_content = ft.Column(
                 [
@@ -255,14 +293,13 @@ class HomeView(ft.Container):
             self.current_email = get_current_account_email()
             accounts = list_cc_data()
             
-        # Refresh accounts list
-        self.accounts_list.controls.clear()
-        
         # Update stats badge
         self.stats_badge_text.value = f"{len(accounts)}"
         
         if not accounts:
-            self.accounts_list.controls.append(
+            self.account_rows = []
+            self.reset_account_window()
+            self.accounts_list.controls = [
                 ft.Container(
                     content=ft.Column(
                         [
@@ -276,15 +313,124 @@ class HomeView(ft.Container):
                     padding=40,
                     expand=True
                 )
-            )
+            ]
         else:
-            for idx, acc in enumerate(accounts):
-                is_current = (acc.get('email') == self.current_email)
-                self.accounts_list.controls.append(self.create_account_row(acc, is_current))
+            self.set_account_model(accounts)
         
         if self.page:
             self.update()
 
+    def create_accounts_list(self):
+        # Cards carry their own bottom margin, spacing would break the row extent
+        return ft.Column(
+            spacing=0,
+            scroll=ft.ScrollMode.HIDDEN,
+            on_scroll=self.on_accounts_scroll,
+            on_scroll_interval=30
+        )
+
+    def account_signature(self, acc, is_current):
+        """Everything a card renders; a card is rebound only when this changes"""
+        return (
+            acc.get('name'),
+            acc.get('email'),
+            acc.get('last_used'),
+            acc.get('billing_type'),
+            is_current,
+            self.app_state.selected_app,
+        )
+
+    def set_account_model(self, accounts):
+        """Replace the account model and re-render the visible window
+
+        The model is just the account dicts; controls only exist for the
+        rows inside the window (see render_account_window).
+        """
+        self.account_rows = [(acc, acc.get('email') == self.current_email) for acc in accounts]
+        # The list may have shrunk below the current scroll position
+        max_offset = max(0.0, len(self.account_rows) * ROW_EXTENT - self.viewport_height)
+        self.scroll_offset = min(self.scroll_offset, max_offset)
+        return self.render_account_window()
+
+    def visible_row_range(self):
+        """Indexes [first, last) of the rows to build, overscan included"""
+        count = len(self.account_rows)
+        first = int(self.scroll_offset // ROW_EXTENT) - ROW_OVERSCAN
+        last = int((self.scroll_offset + self.viewport_height) // ROW_EXTENT) + 1 + ROW_OVERSCAN
+        return max(0, min(first, count)), max(0, min(last, count))
+
+    def render_account_window(self):
+        """Build/recycle the cards of the visible window
+
+        Cards that stay in the window are reused as-is (or rebound if their
+        signature changed), cards that scroll out go to a pool and are rebound
+        to the rows scrolling in. Spacers stand in for the rows outside the
+        window, so the scroll extent matches the full list.
+
+        Returns:
+            (created, recycled) card counts
+        """
+        first, last = self.visible_row_range()
+        window = self.account_rows[first:last]
+        window_ids = {acc['id'] for acc, _ in window}
+
+        pool = self.card_pool
+        for acc_id, (_, card) in self.card_cache.items():
+            if acc_id not in window_ids:
+                pool.append(card)
+
+        cache = {}
+        controls = [self.top_spacer]
+        created = recycled = 0
+        for acc, is_current in window:
+            signature = self.account_signature(acc, is_current)
+            cached = self.card_cache.get(acc['id'])
+            if cached:
+                card = cached[1]
+                if cached[0] != signature:
+                    self.bind_account_row(card, acc, is_current)
+            else:
+                if pool:
+                    card = pool.pop()
+                    recycled += 1
+                else:
+                    card = self.build_account_row()
+                    created += 1
+                self.bind_account_row(card, acc, is_current)
+            cache[acc['id']] = (signature, card)
+            controls.append(card)
+        controls.append(self.bottom_spacer)
+
+        # Keep at most one window's worth of spare cards
+        del pool[last - first:]
+        self.card_cache = cache
+        self.window_range = (first, last)
+        self.top_spacer.height = first * ROW_EXTENT
+        self.bottom_spacer.height = (len(self.account_rows) - last) * ROW_EXTENT
+
+        # Only touch the list if membership or order changed
+        current = self.accounts_list.controls
+        if len(current) != len(controls) or any(a is not b for a, b in zip(current, controls)):
+            self.accounts_list.controls = controls
+        return created, recycled
+
+    def on_accounts_scroll(self, e):
+        self.scroll_offset = max(0.0, e.pixels)
+        if e.viewport_dimension:
+            self.viewport_height = e.viewport_dimension
+        # Nothing to do while the overscan still covers the viewport
+        if self.visible_row_range() == self.window_range or not self.account_rows:
+            return
+        self.render_account_window()
+        if self.accounts_list.page:
+            self.accounts_list.update()
+
+    def reset_account_window(self):
+        """Drop all cards (e.g. after a theme/locale change), the model stays"""
+        self.card_cache.clear()
+        self.card_pool.clear()
+        self.window_range = (0, 0)
+
     def format_last_used(self, iso_str):
         if not iso_str:
             return self.app_state.get_text("never")
@@ -294,76 +440,74 @@ class HomeView(ft.Container):
         except:
             return str(iso_str).split('T')[0]
 
-    def create_account_row(self, acc, is_current):
-        # Gradient effect for current account card
-        # Use a subtle gradient if current, else solid color
-        # Flet Container supports gradient
-        
-        bg_color = self.palette.bg_card
-        border = None
-        
-        if is_current:
-            # Highlight current account with a subtle border
-            border = ft.border.all(1, self.palette.primary)
-        
+    def build_account_row(self):
+        """Build an unbound account card; bind_account_row fills it in
+
+        References to the parts that change per account are kept in
+        card.data so a card can be recycled for another account.
+        """
+        refs = {"id": None}
+        refs["avatar_text"] = ft.Text("", color="#FFFFFF", weight=ft.FontWeight.BOLD, size=16)
+        refs["avatar_shadow"] = ft.BoxShadow(
+            spread_radius=0,
+            blur_radius=6,
+            color="#00000000",
+            offset=ft.Offset(0, 2),
+        )
+        refs["avatar"] = ft.Container(
+            content=refs["avatar_text"],
+            width=40,
+            height=40,
+            border_radius=20,
+            alignment=ft.alignment.center,
+            shadow=refs["avatar_shadow"]
+        )
+        refs["name"] = ft.Text("", size=15, weight=ft.FontWeight.BOLD, color=self.palette.text_main)
+        refs["current_badge"] = ft.Container(
+            content=ft.Text(self.app_state.get_text("current"), size=10, color=self.palette.primary, weight=ft.FontWeight.BOLD),
+            bgcolor=self.palette.bg_light_blue,
+            padding=ft.padding.symmetric(horizontal=6, vertical=2),
+            border_radius=4,
+            visible=False
+        )
+        refs["email"] = ft.Text("", size=12, color=self.palette.text_grey)
+        refs["usage_text"] = ft.Text("", size=11, color=self.palette.text_grey)
+        # Usage Status (Claude only)
+        refs["usage"] = ft.Container(
+            content=ft.Row(
+                [
+                    ft.Icon(ft.Icons.CREDIT_CARD, size=10, color=self.palette.text_grey),
+                    refs["usage_text"]
+                ],
+                spacing=4,
+                vertical_alignment=ft.CrossAxisAlignment.CENTER
+            ),
+            visible=False
+        )
+        refs["last_used"] = ft.Text("", size=12, color=self.palette.text_grey, weight=ft.FontWeight.W_500)
+        refs["switch_button"] = ft.IconButton(
+            icon=ft.Icons.SWAP_HORIZ,
+            icon_color=self.palette.primary,
+            tooltip=self.app_state.get_text("switch_to"),
+            on_click=lambda e: self.switch_to_account(refs["id"])
+        )
+
         return ft.Container(
             content=ft.Row(
                 [
                     # Left: Avatar & Info
                     ft.Row(
                         [
-                            ft.Container(
-                                content=ft.Text(
-                                    acc['name'][0].upper() if acc['name'] else "?", 
-                                    color="#FFFFFF",
-                                    weight=ft.FontWeight.BOLD,
-                                    size=16
-                                ),
-                                width=40,
-                                height=40,
-                                border_radius=20,
-                                bgcolor=self.palette.primary if is_current else self.palette.text_grey,
-                                alignment=ft.alignment.center,
-                                shadow=ft.BoxShadow(
-                                    spread_radius=0,
-                                    blur_radius=6,
-                                    color=ft.Colors.with_opacity(0.3, self.palette.primary) if is_current else "#00000000",
-                                    offset=ft.Offset(0, 2),
-                                )
-                            ),
+                            refs["avatar"],
                             ft.Column(
                                 [
                                     ft.Row(
-                                        [
-                                            ft.Text(acc['name'], size=15, weight=ft.FontWeight.BOLD, color=self.palette.text_main),
-                                            ft.Container(
-                                                content=ft.Text(self.app_state.get_text("current"), size=10, color=self.palette.primary, weight=ft.FontWeight.BOLD),
-                                                bgcolor=self.palette.bg_light_blue,
-                                                padding=ft.padding.symmetric(horizontal=6, vertical=2),
-                                                border_radius=4,
-                                                visible=is_current
-                                            )
-                                        ],
+                                        [refs["name"], refs["current_badge"]],
                                         spacing=6,
                                         vertical_alignment=ft.CrossAxisAlignment.CENTER
                                     ),
-                                    ft.Text(acc['email'], size=12, color=self.palette.text_grey),
-                                    # Usage Status (Claude only)
-                                    ft.Container(
-                                        content=ft.Row(
-                                            [
-                                                ft.Icon(ft.Icons.CREDIT_CARD, size=10, color=self.palette.text_grey),
-                                                ft.Text(
-                                                    f"{self.app_state.get_text('usage_status')}: {self.app_state.get_text('billing_type_' + acc.get('billing_type', 'none'))}",
-                                                    size=11, 
-                                                    color=self.palette.text_grey
-                                                )
-                                            ],
-                                            spacing=4,
-                                            vertical_alignment=ft.CrossAxisAlignment.CENTER
-                                        ),
-                                        visible=(self.app_state.selected_app == "claude" and "billing_type" in acc)
-                                    )
+                                    refs["email"],
+                                    refs["usage"]
                                 ],
                                 spacing=2,
                                 alignment=ft.MainAxisAlignment.CENTER
@@ -383,12 +527,7 @@ class HomeView(ft.Container):
                                         color=self.palette.text_grey,
                                         text_align=ft.TextAlign.RIGHT
                                     ),
-                                    ft.Text(
-                                        self.format_last_used(acc.get('last_used')), 
-                                        size=12, 
-                                        color=self.palette.text_grey,
-                                        weight=ft.FontWeight.W_500
-                                    ),
+                                    refs["last_used"],
                                 ],
                                 spacing=2,
                                 alignment=ft.MainAxisAlignment.CENTER,
@@ -396,18 +535,12 @@ class HomeView(ft.Container):
                             ),
                             ft.Row(
                                 [
-                                    ft.IconButton(
-                                        icon=ft.Icons.SWAP_HORIZ,
-                                        icon_color=self.palette.primary,
-                                        tooltip=self.app_state.get_text("switch_to"),
-                                        on_click=lambda e: self.switch_to_account(acc['id']),
-                                        visible=not is_current
-                                    ),
+                                    refs["switch_button"],
                                     ft.IconButton(
                                         icon=AppIcons.delete,
                                         icon_color="#FF3B30",
                                         tooltip=self.app_state.get_text("delete_backup"),
-                                        on_click=lambda e: self.delete_acc(acc['id'])
+                                        on_click=lambda e: self.delete_acc(refs["id"])
                                     ),
                                 ],
                                 spacing=0
@@ -420,9 +553,11 @@ class HomeView(ft.Container):
                 alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
                 vertical_alignment=ft.CrossAxisAlignment.CENTER
             ),
+            # Fixed height so the list can be windowed by row index
+            height=ROW_HEIGHT,
+            margin=ft.margin.only(bottom=ROW_GAP),
             padding=ft.padding.symmetric(horizontal=20, vertical=12),
-            bgcolor=bg_color,
-            border=border,
+            bgcolor=self.palette.bg_card,
             border_radius=RADIUS_CARD,
             shadow=ft.BoxShadow(
                 spread_radius=0,
@@ -431,9 +566,30 @@ class HomeView(ft.Container):
                 offset=ft.Offset(0, 2),
             ),
             animate=ft.Animation(200, ft.AnimationCurve.EASE_OUT),
-            on_hover=self.on_card_hover
+            on_hover=self.on_card_hover,
+            data=refs
         )
 
+    def bind_account_row(self, card, acc, is_current):
+        """Point a card at an account"""
+        refs = card.data
+        refs["id"] = acc['id']
+
+        # Highlight current account with a subtle border
+        card.border = ft.border.all(1, self.palette.primary) if is_current else None
+
+        refs["avatar_text"].value = acc['name'][0].upper() if acc['name'] else "?"
+        refs["avatar"].bgcolor = self.palette.primary if is_current else self.palette.text_grey
+        refs["avatar_shadow"].color = ft.Colors.with_opacity(0.3, self.palette.primary) if is_current else "#00000000"
+        refs["name"].value = acc['name']
+        refs["current_badge"].visible = is_current
+        refs["email"].value = acc['email']
+        refs["usage"].visible = (self.app_state.selected_app == "claude" and "billing_type" in acc)
+        if refs["usage"].visible:
+            refs["usage_text"].value = f"{self.app_state.get_text('usage_status')}: {self.app_state.get_text('billing_type_' + acc.get('billing_type', 'none'))}"
+        refs["last_used"].value = self.format_last_used(acc.get('last_used'))
+        refs["switch_button"].visible = not is_current
+
     def on_card_hover(self, e):
         # Only show shadow hover effect in light mode or if shadow is visible
         if self.palette.shadow != "#00000000":
@@ -447,6 +603,7 @@ class HomeView(ft.Container):
         while self.running:
             is_running = False
             app_name = "App"
+            usage = None
             
             if self.app_state.selected_app == "antigravity":
                 is_running = is_process_running()
@@ -454,6 +611,12 @@ class HomeView(ft.Container):
             elif self.app_state.selected_app == "claude":
                 is_running = is_claude_running()
                 app_name = "Claude Code"
+
+            if is_running:
+                try:
+                    usage = get_resource_sampler().sample(self.app_state.selected_app)
+                except Exception:
+                    usage = None
             
             # Update Status Bar
             if hasattr(self, 'status_bar') and self.page:
@@ -464,12 +627,21 @@ class HomeView(ft.Container):
                         self.status_bar_icon.color = "#34C759"
                         # We might want to parameterize the status string too
                         self.status_bar_text.value = f"{app_name} is running"
+                        self.status_bar.tooltip = None
+                        if usage and usage.process_count:
+                            self.status_bar_text.value += f"  ·  {format_bytes(usage.rss)}  ·  CPU {usage.cpu_percent:.0f}%"
+                            # Per-session breakdown, heaviest first
+                            self.status_bar.tooltip = "\n".join(
+                                f"{label}: {format_bytes(s['rss'])}, CPU {s['cpu_percent']:.0f}%, {s['process_count']} proc"
+                                for label, s in sorted(usage.sessions.items(), key=lambda item: -item[1]["rss"])
+                            )
                         self.status_bar_text.color = "#34C759"
                     else:
                         self.status_bar.bgcolor = self.palette.bg_light_red
                         self.status_bar_icon.name = AppIcons.pause_circle
                         self.status_bar_icon.color = "#FF3B30"
                         self.status_bar_text.value = f"{app_name} stopped (Click to start)"
+                        self.status_bar.tooltip = None
                         self.status_bar_text.color = "#FF3B30"
                     
                     self.update()
@@ -1,10 +1,54 @@
 import flet as ft
+import os
+import re
 import sys
+import threading
+from collections import deque, namedtuple
+from datetime import datetime
 from theme import get_palette
+from icons import AppIcons
+from utils import LOG_LEVELS, LOG_SOURCES, flush_logs, load_settings, subscribe_logs
+from log_tail import LogHistory, read_context
+from log_search import LogIndex, search_files
+from app_log_tail import AppLogTailer
 
 RADIUS_CARD = 12
 PADDING_PAGE = 20
 
+LEVEL_COLORS = {
+    "INFO": "#34C759",
+    "WARN": "#FFCC00",
+    "ERR": "#FF3B30",
+    "DBUG": "#8E8E93",
+}
+DEFAULT_LOG_COLOR = "#FFFFFF"
+# Lines from the apps' own log files
+APP_LOG_COLOR = "#C7C7CC"
+APP_LOG_LEVEL_RE = re.compile(r"\[(error|warn|warning)\]|\b(ERROR|WARN|WARNING)\b")
+
+# Records loaded from app.log on open and per "scrolled to the top" page
+HISTORY_PAGE_LINES = 200
+# Distance from the list edges (px) that counts as top / bottom
+SCROLL_EDGE = 40
+
+# Rendered lines kept in the view ("log_view_max_lines" in settings.json overrides)
+DEFAULT_MAX_LINES = 2000
+# New lines are pushed to the UI at most once per interval (seconds)
+FLUSH_INTERVAL = 1 / 30
+
+# Search: debounce while typing (seconds), results listed at most
+SEARCH_DEBOUNCE = 0.25
+MAX_SEARCH_RESULTS = 200
+# Lines shown around a match found on disk
+CONTEXT_LINES = 50
+HIGHLIGHT_COLOR = "#3A3A3C"
+
+# One buffered log line; source is None for lines not tied to an app,
+# timestamp is None for plain print() output
+LogLine = namedtuple("LogLine", ["key", "text", "color", "source", "timestamp"])
+
+ANSI_ESCAPE = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+
 class LogsView(ft.Container):
     def __init__(self, page: ft.Page, app_state):
         super().__init__()
@@ -22,11 +66,47 @@ class LogsView(ft.Container):
             spacing=5,
             padding=10,
             auto_scroll=True,
+            on_scroll=self.on_log_scroll,
+            on_scroll_interval=100,
         )
-        
-        # Redirect stdout to capture logs
+
+        # The view is a bounded buffer: the oldest lines are evicted past max_lines.
+        # Per-source deques index the same LogLines so the filter can rebuild
+        # the list from its own slice without scanning everything.
+        self.max_lines = self.get_max_lines()
+        self.lines = deque(maxlen=self.max_lines)
+        self.by_source = {source: deque(maxlen=self.max_lines) for source in LOG_SOURCES}
+        self.source_filter = "all"
+        self._controls_lock = threading.RLock()
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._flush_timer = None
+        self._line_key = 0
+
+        # Token index of the buffered lines, searched before the files on disk
+        self.index = LogIndex()
+        self.search_query = ""
+        self._search_timer = None
+        self._search_cancel = threading.Event()
+        self.results_view = ft.ListView(spacing=2, padding=5, height=160)
+        # While a disk match is shown in context, live lines are only buffered
+        self.context_mode = False
+        self.context_label = ft.Text("", size=12, color="#8E8E93")
+
+        # Earlier history from app.log (read backwards, never the whole file)
+        self._history_lock = threading.Lock()
+        flush_logs()
+        self.history = LogHistory()
+        self.load_older_history()
+
+        # Logger records arrive typed; stdout is still redirected for plain print() output
+        subscribe_logs(self.on_log_record)
         self.original_stdout = sys.stdout
-        sys.stdout = self.LogRedirector(self.log_view)
+        sys.stdout = self.LogRedirector(self.append_line)
+
+        # The apps' own log files, through the same buffer
+        self.app_logs = AppLogTailer(self.on_app_log_lines)
+        threading.Thread(target=self.app_logs.start, daemon=True).start()
         
         self.build_ui()
 
@@ -54,6 +134,12 @@ class LogsView(ft.Container):
         self.rebuild_ui()
 
     def rebuild_ui(self):
+        self.results_container = ft.Container(
+            content=self.results_view,
+            bgcolor="#1E1E1E", # Console always dark
+            border_radius=RADIUS_CARD,
+            visible=bool(self.search_query.strip()),
+        )
         self.content = ft.Column(
             [
                 ft.Row(
@@ -67,7 +153,8 @@ class LogsView(ft.Container):
                                 ft.dropdown.Option("claude", self.app_state.get_text("claude")),
                                 ft.dropdown.Option("codex", self.app_state.get_text("codex")),
                             ],
-                            value="all",
+                            value=self.source_filter,
+                            on_change=self.on_source_change,
                             text_size=13,
                             border_color=self.palette.sidebar_border,
                             focused_border_color=self.palette.primary,
@@ -79,7 +166,29 @@ class LogsView(ft.Container):
                     alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
                     vertical_alignment=ft.CrossAxisAlignment.CENTER
                 ),
-                ft.Container(height=20),
+                ft.Container(height=10),
+                ft.TextField(
+                    value=self.search_query,
+                    hint_text=self.app_state.get_text("search_logs"),
+                    prefix_icon=AppIcons.search,
+                    on_change=self.on_search_change,
+                    text_size=13,
+                    height=40,
+                    content_padding=ft.padding.symmetric(horizontal=10, vertical=0),
+                    border_color=self.palette.sidebar_border,
+                    focused_border_color=self.palette.primary,
+                    filled=True,
+                    bgcolor=self.palette.bg_card,
+                ),
+                self.results_container,
+                ft.Row(
+                    [
+                        self.context_label,
+                        ft.TextButton(self.app_state.get_text("back_to_live"), on_click=self.exit_context),
+                    ],
+                    visible=self.context_mode,
+                ),
+                ft.Container(height=10),
                 
                 # Logs Section
                 ft.Container(
@@ -99,9 +208,307 @@ class LogsView(ft.Container):
             horizontal_alignment=ft.CrossAxisAlignment.START
         )
 
+    @staticmethod
+    def get_max_lines():
+        try:
+            return max(100, int(load_settings().get("log_view_max_lines", DEFAULT_MAX_LINES)))
+        except (TypeError, ValueError):
+            return DEFAULT_MAX_LINES
+
+    def format_record(self, record):
+        """(text, color) of a record, None if it is hidden"""
+        # Debug records always go to the file, show them only when DEBUG is set
+        if record.level == "DBUG" and not os.environ.get("DEBUG"):
+            return None
+        symbol = LOG_LEVELS.get(record.level, (record.level,))[0]
+        return f"{symbol} {record.message}", LEVEL_COLORS.get(record.level, DEFAULT_LOG_COLOR)
+
+    def make_line(self, line, highlight=False):
+        return ft.Text(
+            line.text,
+            font_family="Monaco, Menlo, Courier New, monospace",
+            size=12,
+            color=line.color,
+            bgcolor=HIGHLIGHT_COLOR if highlight else None,
+            selectable=True,
+            key=line.key
+        )
+
+    def matches(self, line):
+        return self.source_filter == "all" or line.source == self.source_filter
+
+    def visible_lines(self):
+        """Buffered lines of the current filter, oldest first"""
+        if self.source_filter == "all":
+            return self.lines
+        return self.by_source.get(self.source_filter, ())
+
+    def on_log_record(self, record):
+        line = self.format_record(record)
+        if line:
+            self.append_line(*line, source=record.source, timestamp=record.timestamp)
+
+    def on_app_log_lines(self, source, path, lines):
+        for text in lines:
+            color = APP_LOG_COLOR
+            match = APP_LOG_LEVEL_RE.search(text)
+            if match:
+                level = (match.group(1) or match.group(2)).lower()
+                color = LEVEL_COLORS["ERR"] if level == "error" else LEVEL_COLORS["WARN"]
+            self.append_line(f"[{path.name}] {text}", color, source=source)
+
+    def on_source_change(self, e):
+        self.source_filter = e.control.value or "all"
+        self.render_lines()
+
+    def render_lines(self):
+        """Rebuild the list from the filter's index (cost: visible lines only)"""
+        with self._controls_lock:
+            if self.context_mode:
+                self.context_mode = False
+                self.rebuild_ui()
+                if self.page:
+                    self.update()
+            self.log_view.controls = [self.make_line(line) for line in self.visible_lines()]
+            self.log_view.auto_scroll = True
+        if self.log_view.page:
+            try:
+                self.log_view.update()
+            except:
+                pass
+
+    def on_log_scroll(self, e):
+        # Follow new lines only while the user is at the bottom
+        self.log_view.auto_scroll = e.pixels >= e.max_scroll_extent - SCROLL_EDGE
+        if e.pixels <= e.min_scroll_extent + SCROLL_EDGE:
+            self.load_older_history()
+
+    def load_older_history(self):
+        """Prepend the next page of app.log history, keeping the scroll position"""
+        if self.history is None or self.history.exhausted or self.context_mode:
+            return
+        if not self._history_lock.acquire(blocking=False):
+            return
+        try:
+            with self._controls_lock:
+                controls = []
+                # Keep paging until something is visible under the current filter
+                while not controls and not self.history.exhausted:
+                    room = self.max_lines - len(self.lines)
+                    if room <= 0:
+                        return
+                    older = []
+                    for record in self.history.older(min(HISTORY_PAGE_LINES, room)):
+                        line = self.format_record(record)
+                        if line:
+                            older.append(LogLine(self.next_key(), line[0], line[1], record.source, record.timestamp))
+                    for line in reversed(older):
+                        self.lines.appendleft(line)
+                        index = self.by_source.get(line.source)
+                        # appendleft on a full deque would evict the newest line
+                        if index is not None and len(index) < index.maxlen:
+                            index.appendleft(line)
+                    for line in older:
+                        self.index.add(line.key, line.text)
+                    controls = [self.make_line(line) for line in older if self.matches(line)]
+                if not controls:
+                    return
+
+                anchor = self.log_view.controls[0].key if self.log_view.controls else None
+                self.log_view.controls[0:0] = controls
+            if self.log_view.page:
+                self.log_view.update()
+                if anchor:
+                    self.log_view.scroll_to(key=anchor, duration=0)
+        except Exception:
+            pass
+        finally:
+            self._history_lock.release()
+
+    def next_key(self):
+        # Keyed lines let scroll_to anchor on them when history is prepended
+        with self._pending_lock:
+            self._line_key += 1
+            return f"line-{self._line_key}"
+
+    def append_line(self, text, color=DEFAULT_LOG_COLOR, source=None, timestamp=None):
+        """Queue a line; callable from any thread, rendering is batched per frame"""
+        with self._pending_lock:
+            self._pending.append((text, color, source, timestamp))
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(FLUSH_INTERVAL, self.flush_pending)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def flush_pending(self):
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+            self._flush_timer = None
+        if not pending:
+            return
+
+        with self._controls_lock:
+            evicted = len(self.lines) + len(pending) > self.max_lines
+            visible = []
+            for text, color, source, timestamp in pending:
+                line = LogLine(self.next_key(), text, color, source, timestamp)
+                if len(self.lines) == self.lines.maxlen:
+                    self.index.remove(self.lines[0].key)
+                self.lines.append(line)
+                self.index.add(line.key, line.text)
+                index = self.by_source.get(source)
+                if index is not None:
+                    index.append(line)
+                if self.matches(line):
+                    visible.append(line)
+
+            # A burst larger than the buffer only needs its tail rendered
+            if self.context_mode:
+                visible = []
+            new_controls = [self.make_line(line) for line in visible[-self.max_lines:]]
+            controls = self.log_view.controls
+            controls.extend(new_controls)
+            overflow = len(controls) - self.max_lines
+            if overflow > 0:
+                del controls[:overflow]
+            if evicted:
+                # Dropped lines leave a gap to the file history, stop paging it
+                self.history = None
+
+        # Only try to update if the control is attached to a page
+        if self.log_view.page and new_controls:
+            try:
+                self.log_view.update()
+            except:
+                pass
+
+    # ---------------------------------------------------------------------
+    # Search
+    # ---------------------------------------------------------------------
+
+    def on_search_change(self, e):
+        self.search_query = e.control.value or ""
+        if self._search_timer:
+            self._search_timer.cancel()
+        self._search_timer = threading.Timer(SEARCH_DEBOUNCE, self.run_search)
+        self._search_timer.daemon = True
+        self._search_timer.start()
+
+    def run_search(self):
+        """Buffer matches from the index right away, then stream disk matches"""
+        self._search_cancel.set()
+        self._search_cancel = cancel = threading.Event()
+        query = self.search_query.strip()
+        # Bound to this query: a superseded scan keeps appending to its own list,
+        # never to the one on screen
+        results = []
+        self.results_view.controls = results
+        self.results_container.visible = bool(query)
+        if not query:
+            self.refresh_results()
+            return
+
+        keys = self.index.search(query)
+        with self._controls_lock:
+            hits = [line for line in self.lines if line.key in keys]
+        hits = hits[-MAX_SEARCH_RESULTS:]
+        seen = {(int(line.timestamp), line.text) for line in hits if line.timestamp}
+        for line in reversed(hits):
+            results.append(self.make_result(line, lambda e, key=line.key: self.jump_to_line(key)))
+        self.refresh_results()
+
+        def scan():
+            for batch in search_files(query, cancel=cancel):
+                added = False
+                # Newest file matches last in each batch, list them newest first below the buffer hits
+                for path, offset, line_no, record in reversed(batch):
+                    if cancel.is_set():
+                        return
+                    line = self.format_record(record)
+                    if not line or (int(record.timestamp), line[0]) in seen:
+                        continue
+                    if len(results) >= MAX_SEARCH_RESULTS:
+                        cancel.set()
+                        self.refresh_results()
+                        return
+                    result = LogLine(f"{path.name}:{line_no}", line[0], line[1], record.source, record.timestamp)
+                    results.append(self.make_result(result, lambda e, p=path, o=offset: self.show_context(p, o)))
+                    added = True
+                if added and not cancel.is_set():
+                    self.refresh_results()
+            if not results and not cancel.is_set():
+                results.append(ft.Text(self.app_state.get_text("search_no_results"), size=12, color="#8E8E93"))
+                self.refresh_results()
+
+        threading.Thread(target=scan, daemon=True).start()
+
+    def make_result(self, line, on_click):
+        stamp = datetime.fromtimestamp(line.timestamp).strftime("%m-%d %H:%M:%S") if line.timestamp else ""
+        return ft.Container(
+            content=ft.Text(
+                f"{stamp}  {line.text}",
+                font_family="Monaco, Menlo, Courier New, monospace",
+                size=12,
+                color=line.color,
+                max_lines=1,
+                overflow=ft.TextOverflow.ELLIPSIS,
+                tooltip=line.key if not line.key.startswith("line-") else None,
+            ),
+            on_click=on_click,
+            padding=ft.padding.symmetric(horizontal=5, vertical=2),
+        )
+
+    def refresh_results(self):
+        if self.page:
+            try:
+                self.update()
+            except:
+                pass
+
+    def jump_to_line(self, key):
+        """Scroll the live view to a buffered line"""
+        line = next((line for line in self.lines if line.key == key), None)
+        if line is None:
+            return
+        if self.context_mode or not self.matches(line):
+            self.source_filter = "all"
+            self.context_mode = False
+            self.rebuild_ui()
+            self.render_lines()
+        self.log_view.auto_scroll = False
+        if self.page:
+            self.update()
+            self.log_view.scroll_to(key=key, duration=300)
+
+    def show_context(self, path, offset):
+        """Show the lines around a match found in a log file"""
+        try:
+            records, hit = read_context(path, offset, CONTEXT_LINES, CONTEXT_LINES)
+        except OSError:
+            return
+        with self._controls_lock:
+            controls = []
+            for i, record in enumerate(records):
+                text, color = self.format_record(record) or (f"DBUG {record.message}", LEVEL_COLORS["DBUG"])
+                controls.append(self.make_line(LogLine(f"context-{i}", text, color, record.source, record.timestamp), highlight=i == hit))
+            self.context_mode = True
+            self.context_label.value = f"{path.name}"
+            self.log_view.auto_scroll = False
+            self.log_view.controls = controls
+            self.rebuild_ui()
+        if self.page:
+            self.update()
+            if hit is not None:
+                self.log_view.scroll_to(key=f"context-{hit}", duration=0)
+
+    def exit_context(self, e=None):
+        self.render_lines()
+
     class LogRedirector:
-        def __init__(self, log_view):
-            self.log_view = log_view
+        """Plain print() output (logger records come through on_log_record)"""
+
+        def __init__(self, append_line):
+            self.append_line = append_line
             self.terminal = sys.stdout
 
         def write(self, message):
@@ -112,46 +519,12 @@ class LogsView(ft.Container):
                     pass
             if not message.strip():
                 return
-                
-            # Simple ANSI color parsing
-            text_color = "#FFFFFF" # Default log color
+
             clean_message = message.strip()
-            
-            if "\033[32m" in message: # Green (INFO)
-                text_color = "#34C759"
-                clean_message = clean_message.replace("\033[32m", "").replace("\033[0m", "")
-            elif "\033[33m" in message: # Yellow (WARN)
-                text_color = "#FFCC00"
-                clean_message = clean_message.replace("\033[33m", "").replace("\033[0m", "")
-            elif "\033[31m" in message: # Red (ERR)
-                text_color = "#FF3B30"
-                clean_message = clean_message.replace("\033[31m", "").replace("\033[0m", "")
-            elif "\033[90m" in message: # Grey (DEBUG)
-                text_color = "#8E8E93"
-                clean_message = clean_message.replace("\033[90m", "").replace("\033[0m", "")
-            
-            # Remove any remaining ANSI codes if simple parsing missed them
             if "\033[" in clean_message:
-                import re
-                ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-                clean_message = ansi_escape.sub('', clean_message)
-
-            self.log_view.controls.append(
-                ft.Text(
-                    clean_message, 
-                    font_family="Monaco, Menlo, Courier New, monospace", 
-                    size=12,
-                    color=text_color,
-                    selectable=True
-                )
-            )
-            
-            # Only try to update if the control is attached to a page
-            if self.log_view.page:
-                try:
-                    self.log_view.update()
-                except:
-                    pass
+                clean_message = ANSI_ESCAPE.sub('', clean_message)
+            self.append_line(clean_message)
 
         def flush(self):
-            self.terminal.flush()
+            if self.terminal:
+                self.terminal.flush()
@@ -280,15 +280,63 @@ class SettingsView(ft.Container):
             )
         )
 
+        # Switch Mode (shared live files vs isolated CLAUDE_CONFIG_DIR per account)
+        isolated_mode_card = ft.Container(
+            content=ft.Row(
+                [
+                    ft.Row(
+                        [
+                            ft.Container(
+                                content=ft.Icon(ft.Icons.LAYERS, size=24, color=self.palette.primary),
+                                bgcolor=self.palette.bg_light_blue,
+                                padding=8,
+                                border_radius=8
+                            ),
+                            ft.Column(
+                                [
+                                    ft.Text(self.app_state.get_text("isolated_mode"), size=15, weight=ft.FontWeight.W_600, color=self.palette.text_main),
+                                    ft.Text(self.app_state.get_text("isolated_mode_desc"), size=12, color=self.palette.text_grey, width=380),
+                                ],
+                                spacing=2,
+                                alignment=ft.MainAxisAlignment.CENTER
+                            )
+                        ],
+                        spacing=15
+                    ),
+                    ft.Switch(
+                        value=claude_manager.get_switch_mode() == claude_manager.SWITCH_MODE_ISOLATED,
+                        active_color=self.palette.primary,
+                        on_change=self._on_isolated_mode_change
+                    ),
+                ],
+                alignment=ft.MainAxisAlignment.SPACE_BETWEEN
+            ),
+            padding=20,
+            bgcolor=self.palette.bg_card,
+            border_radius=RADIUS_CARD,
+            shadow=ft.BoxShadow(
+                spread_radius=0,
+                blur_radius=10,
+                color=self.palette.shadow,
+                offset=ft.Offset(0, 4),
+            ),
+        )
+
         return ft.Column(
             [
                 config_file_card,
                 ft.Container(height=20),
-                profiles_dir_card
+                profiles_dir_card,
+                ft.Container(height=20),
+                isolated_mode_card
             ],
             spacing=0
         )
 
+    def _on_isolated_mode_change(self, e):
+        mode = claude_manager.SWITCH_MODE_ISOLATED if e.control.value else claude_manager.SWITCH_MODE_SHARED
+        claude_manager.set_switch_mode(mode)
+
 
 
     def _on_switch_click(self, e, account_id):
@@ -2,6 +2,7 @@
 import argparse
 import sys
 import os
+import time
 
 # Add gui directory to sys.path so internal modules can import each other (e.g. account_manager importing utils)
 sys.path.append(os.path.join(os.path.dirname(__file__), "gui"))
@@ -15,7 +16,9 @@ try:
         switch_account,
         delete_account
     )
-    from gui.process_manager import start_antigravity, close_antigravity
+    from gui.process_manager import start_antigravity, close_antigravity, is_claude_running, wait_ready, get_resource_sampler, format_bytes
+    from gui import claude_manager
+    from gui import supervisor
 except ImportError as e:
     print(f"Import Error: {e}")
     sys.exit(1)
@@ -187,15 +190,43 @@ def cli_mode():
     # Switch
     switch_parser = subparsers.add_parser("switch", help="Switch to specified archive")
     switch_parser.add_argument("--id", "-i", required=True, help="Archive ID")
+    switch_parser.add_argument("--wait", "-w", action="store_true", help="Wait until Antigravity is ready and report switch latency")
+    switch_parser.add_argument("--restore-only", action="store_true", help="Restore the archive without starting Antigravity afterwards")
 
     # Delete
     del_parser = subparsers.add_parser("delete", help="Delete archive")
     del_parser.add_argument("--id", "-i", required=True, help="Archive ID")
     
     # Process Control
-    subparsers.add_parser("start", help="Start Antigravity")
+    start_parser = subparsers.add_parser("start", help="Start Antigravity")
+    start_parser.add_argument("--wait", "-w", action="store_true", help="Wait until Antigravity is ready")
+    start_parser.add_argument("--timeout", type=int, default=30, help="Max seconds to wait for readiness (default 30)")
     subparsers.add_parser("stop", help="Close Antigravity")
 
+    # Claude Code: run a command under an isolated account profile
+    exec_parser = subparsers.add_parser("exec", help="Run a command under a Claude account (e.g. exec --account 2 -- claude)")
+    exec_parser.add_argument("--account", "-a", required=True, help="Claude account number")
+    exec_parser.add_argument("cmd", nargs=argparse.REMAINDER, help="Command to run, after --")
+
+    # Claude Code: prune stale project entries from .claude.json
+    compact_parser = subparsers.add_parser("compact", help="Compact Claude .claude.json (archive stale projects)")
+    compact_parser.add_argument("--max-age-days", type=int, default=90, help="Prune projects inactive for N days (0 = off, default 90)")
+    compact_parser.add_argument("--keep-missing", action="store_true", help="Keep projects whose directory no longer exists")
+    compact_parser.add_argument("--max-history", type=int, default=None, help="Keep only the last N history entries per project")
+    compact_parser.add_argument("--dry-run", action="store_true", help="Only report what would be pruned")
+    compact_parser.add_argument("--force", action="store_true", help="Compact even if Claude Code is running")
+
+    # Resource usage of the managed apps
+    stats_parser = subparsers.add_parser("stats", help="Show CPU/memory usage of Antigravity and Claude Code")
+    stats_parser.add_argument("--app", choices=["antigravity", "claude", "all"], default="all", help="App to sample")
+    stats_parser.add_argument("--interval", type=float, default=1.0, help="Seconds between samples")
+    stats_parser.add_argument("--count", type=int, default=2, help="Number of samples (the first one has no CPU baseline)")
+
+    # Supervisor: restart Antigravity after crashes
+    supervise_parser = subparsers.add_parser("supervise", help="Control the Antigravity supervisor daemon")
+    supervise_parser.add_argument("action", choices=["start", "stop", "status", "run"], help="run = supervise in foreground")
+    supervise_parser.add_argument("--policy", "-p", default="default", help="Restart policy (default, aggressive, conservative)")
+
     args = parser.parse_args()
 
     if args.command == "list":
@@ -213,7 +244,7 @@ def cli_mode():
             error(f"Invalid ID or index: {args.id}")
             sys.exit(1)
             
-        if switch_account(real_id):
+        if switch_account(real_id, wait=args.wait and not args.restore_only, restart=not args.restore_only):
             info("Switch successful")
         else:
             sys.exit(1)
@@ -230,15 +261,93 @@ def cli_mode():
             sys.exit(1)
             
     elif args.command == "start":
-        start_antigravity()
+        if not start_antigravity():
+            sys.exit(1)
+        if args.wait and wait_ready(args.timeout) is None:
+            sys.exit(1)
         
     elif args.command == "stop":
         close_antigravity()
 
+    elif args.command == "exec":
+        cmd = args.cmd[1:] if args.cmd and args.cmd[0] == "--" else args.cmd
+        sys.exit(claude_manager.run_with_account(args.account, cmd))
+
+    elif args.command == "stats":
+        show_stats(args.app, args.interval, args.count)
+
+    elif args.command == "supervise":
+        if args.action == "start":
+            if not supervisor.start_daemon([sys.executable, os.path.abspath(__file__)], args.policy):
+                sys.exit(1)
+        elif args.action == "stop":
+            if not supervisor.stop_daemon():
+                sys.exit(1)
+        elif args.action == "run":
+            supervisor.Supervisor(args.policy).run()
+        else:
+            show_supervisor_status()
+
+    elif args.command == "compact":
+        if not args.dry_run and not args.force and is_claude_running():
+            error("Claude Code is running, close it first or use --force")
+            sys.exit(1)
+        result = claude_manager.compact_config(
+            max_age_days=args.max_age_days or None,
+            drop_missing=not args.keep_missing,
+            max_history=args.max_history,
+            dry_run=args.dry_run
+        )
+        if result is None:
+            sys.exit(1)
+
     else:
         # No arguments, enter interactive mode
         interactive_mode()
 
+def show_stats(app="all", interval=1.0, count=2):
+    """Sample and print resource usage of the managed apps"""
+    apps = ["antigravity", "claude"] if app == "all" else [app]
+    names = {"antigravity": "Antigravity", "claude": "Claude Code"}
+    sampler = get_resource_sampler()
+    count = max(1, count)
+    for i in range(count):
+        samples = {name: sampler.sample(name) for name in apps}
+        if i < count - 1:
+            time.sleep(interval)
+
+    print("\n" + "="*50)
+    for name in apps:
+        sample = samples[name]
+        if not sample.process_count:
+            print(f"{names[name]}: not running")
+            continue
+        print(f"{names[name]}: {format_bytes(sample.rss)}, CPU {sample.cpu_percent:.1f}%, "
+              f"{sample.threads} threads, {sample.process_count} processes")
+        for label, session in sorted(sample.sessions.items(), key=lambda item: -item[1]["rss"]):
+            print(f"   {label:<30} {format_bytes(session['rss']):>10}  CPU {session['cpu_percent']:5.1f}%  "
+                  f"({session['process_count']} proc)")
+    print("="*50)
+
+def show_supervisor_status():
+    """Print supervisor state"""
+    state = supervisor.get_supervisor_status()
+    if not state.get("alive") and not state.get("started_at"):
+        info("Supervisor has never run")
+        return
+    print("\n" + "="*50)
+    print(f"🛡️  Supervisor: {state.get('status')} (pid {state.get('pid')}, policy {state.get('policy')})")
+    print("="*50)
+    print(f"   Antigravity running: {'yes' if state.get('app_running') else 'no'}")
+    if state.get("app_up_since"):
+        print(f"   Up since: {state['app_up_since']}")
+    print(f"   Total uptime: {state.get('total_uptime', 0) / 3600:.1f}h")
+    print(f"   Restarts: {state.get('restart_count', 0)}  Crashes: {state.get('crash_count', 0)}")
+    if state.get("last_crash_at"):
+        print(f"   Last crash: {state['last_crash_at']}")
+    if state.get("next_restart_at"):
+        print(f"   Next restart: {state['next_restart_at']}")
+
 def main():
     """Main entry point"""
     # If no command line arguments, enter interactive mode